@@ -1,21 +1,45 @@
+import bz2
+import copy
 import csv
+import glob
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import lzma
 import math
+import mmap
+import operator
 import re
+import sys
+import threading
+import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 import os
+import openpyxl
 import pdfkit
 import cProfile
 
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 from jinja2 import Environment, FileSystemLoader
 from functools import reduce
 from datetime import datetime, date
-from typing import List, Dict, Tuple
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Iterable, Iterator, Callable
 from openpyxl import Workbook
 from openpyxl.styles import Side, Border, Font
 from openpyxl.styles.numbers import FORMAT_PERCENTAGE_00
 from openpyxl.utils import get_column_letter
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 def profile(func):
     """
@@ -67,6 +91,28 @@ class Salary:
         [self.__salary_from, self.__salary_to, self.__salary_currency] \
             = [float(values[0]), float(values[1]), values[2]]
 
+    @staticmethod
+    def has_currency(currency: str) -> bool:
+        """
+        Известен ли курс валюты к рублю
+        :param currency: Код валюты
+
+        >>> Salary.has_currency('usd')
+        True
+        >>> Salary.has_currency('XYZ')
+        False
+        """
+        return currency.strip().upper() in Salary.__currency_to_rub
+
+    def get_values(self) -> Tuple[float, float, str]:
+        """
+        Возвращает нижнюю и верхнюю границы оклада и валюту оклада
+
+        >>> Salary(['10', '15', 'RUR']).get_values()
+        (10.0, 15.0, 'RUR')
+        """
+        return self.__salary_from, self.__salary_to, self.__salary_currency
+
     def __float__(self) -> float:
         """
         Преобразует зарплату к float значению в рублях
@@ -80,8 +126,38 @@ class Salary:
         >>> float(Salary([10.0, 30.0, 'EUR']))
         1198.0
         """
+        if not Salary.has_currency(self.__salary_currency):
+            raise ValueError(f'Неизвестная валюта: {self.__salary_currency}')
+
         return (float(self.__salary_from) + float(self.__salary_to)) / 2 * self.__currency_to_rub[
-            self.__salary_currency.upper()]
+            self.__salary_currency.strip().upper()]
+
+    @staticmethod
+    def convert(salaries_from: List[str | float], salaries_to: List[str | float], currencies: List[str]) -> np.ndarray:
+        """
+        Преобразует массивы зарплат к рублям одной векторной операцией
+        :param salaries_from: Нижние границы оклада
+        :param salaries_to: Верхние границы оклада
+        :param currencies: Валюты оклада
+        :return: Массив зарплат в рублях
+
+        >>> Salary.convert(['10', '10.0'], [20, '30'], ['RUR', 'EUR']).tolist()
+        [15.0, 1198.0]
+        >>> Salary.convert([10], [20], ['XYZ'])
+        Traceback (most recent call last):
+        ...
+        ValueError: Неизвестные валюты: XYZ
+        """
+        codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        unknown = [code for code in codes if not Salary.has_currency(code)]
+
+        if len(unknown) != 0:
+            raise ValueError(f'Неизвестные валюты: {", ".join(unknown)}')
+
+        rates = np.array([Salary.__currency_to_rub[code.strip().upper()] for code in codes], dtype=np.float64)
+
+        return (np.asarray(salaries_from, dtype=np.float64) + np.asarray(salaries_to, dtype=np.float64)) \
+            / 2 * rates[inverse]
 
 
 class Vacancy:
@@ -108,6 +184,7 @@ class Vacancy:
         """
         self.__name = None
         self.__salary = None
+        self.__salary_rub = None
         self.__area_name = None
         self.__published_at = None
         self.__salary_from = None
@@ -115,11 +192,12 @@ class Vacancy:
         self.__salary_currency = None
 
         fields_cases = {
-            'name': lambda value: self.__set_value('name', HelpMethods.delete_rubbish(value)),
+            'name': lambda value: self.__set_value('name', sys.intern(HelpMethods.delete_rubbish(value))),
             'salary_from': lambda value: self.__set_value('salary_from', HelpMethods.delete_rubbish(value)),
             'salary_to': lambda value: self.__set_value('salary_to', HelpMethods.delete_rubbish(value)),
-            'salary_currency': lambda value: self.__set_value('salary_currency', HelpMethods.delete_rubbish(value)),
-            'area_name': lambda value: self.__set_value('area_name', HelpMethods.delete_rubbish(value)),
+            'salary_currency': lambda value: self.__set_value('salary_currency',
+                                                              sys.intern(HelpMethods.delete_rubbish(value))),
+            'area_name': lambda value: self.__set_value('area_name', sys.intern(HelpMethods.delete_rubbish(value))),
             'published_at': lambda value: self.__set_value(
                 'published_at',
                 Vacancy.__get_date(HelpMethods.delete_rubbish(value))),
@@ -133,9 +211,42 @@ class Vacancy:
 
         self.__set_salary()
 
+    def __getstate__(self) -> tuple:
+        """
+        Возвращает состояние вакансии кортежем: шарды датасета передаются между процессами через pickle,
+        и кортеж без словаря атрибутов и отдельного объекта Salary в несколько раз компактнее. Названия,
+        города и валюты интернированы, поэтому pickle передает каждое уникальное значение один раз
+        :return: Кортеж значений полей
+        """
+        return self.__name, self.__salary_from, self.__salary_to, self.__salary_currency, self.__salary_rub, \
+            self.__area_name, self.__published_at
+
+    def __setstate__(self, state: tuple):
+        """
+        Восстанавливает вакансию из кортежа значений полей
+        :param state: Кортеж из __getstate__
+        """
+        self.__name, self.__salary_from, self.__salary_to, self.__salary_currency, self.__salary_rub, \
+            self.__area_name, self.__published_at = state
+        self.__set_salary()
+
     def get_salary(self) -> float:
-        """Возращает зарплату в рублях для данной вакансии"""
-        return float(self.__salary)
+        """Возращает зарплату в рублях для данной вакансии, вычисляя ее только при первом обращении"""
+        if self.__salary_rub is None:
+            self.__salary_rub = float(self.__salary)
+
+        return self.__salary_rub
+
+    def get_salary_values(self) -> Tuple[float, float, str]:
+        """Возвращает очищенные границы оклада и валюту оклада данной вакансии"""
+        return self.__salary.get_values()
+
+    def set_salary(self, salary: float):
+        """
+        Сохраняет зарплату в рублях, вычисленную заранее для всего датасета
+        :param salary: Зарплата в рублях
+        """
+        self.__salary_rub = salary
 
     def get_date(self) -> int:
         """Возвращает год размещения вакансии"""
@@ -145,6 +256,10 @@ class Vacancy:
         """Возвращает город, в котором размещена данная вакансия"""
         return self.__area_name
 
+    def get_name(self) -> str:
+        """Возвращает название вакансии"""
+        return self.__name
+
     def is_suitible(self, name: str) -> bool:
         """
         Содержит ли в названии name
@@ -202,14 +317,374 @@ class Vacancy:
     #     return datetime.strptime(date, '%Y-%m-%dT%H:%M:%S%z')
 
 
-class DataSet:
-    """Класс, представляющий набор данных обо всех вакансиях"""
+class VacancyFilter:
+    """
+    Класс, представляющий скомпилированный фильтр вакансий по названию
+
+    Attributes:
+        kind (str): Вид фильтра: substring, regex или names
+        value (str | frozenset): Подстрока, регулярное выражение или множество названий
+    """
+
+    def __init__(self, kind: str, value: str | Iterable[str]):
+        """
+        Инициализирует объект класса VacancyFilter
+        :param kind: Вид фильтра: substring - вхождение подстроки, regex - поиск по регулярному выражению,
+        names - точное совпадение с одним из названий
+        :param value: Значение, по которому производится фильтрация. Для names одна строка считается одним названием
+
+        >>> VacancyFilter('substring', 'Руководитель').matches('Руководитель группы')
+        True
+        >>> VacancyFilter('regex', '^Аналитик').matches('Старший аналитик')
+        False
+        >>> VacancyFilter('names', ['Аналитик', 'Программист']).matches('Программист')
+        True
+        >>> VacancyFilter('names', 'Аналитик').matches('А')
+        False
+        """
+        if kind == 'names' and isinstance(value, str):
+            value = (value,)
+
+        compilers = {
+            'substring': lambda: (lambda name: value in name),
+            'regex': lambda: re.compile(value).search,
+            'names': lambda: frozenset(value).__contains__,
+        }
+
+        if kind not in compilers:
+            raise ValueError(f'Неизвестный вид фильтра: {kind}')
+
+        self.kind = kind
+        self.value = frozenset(value) if kind == 'names' else value
+        self.__match = compilers[kind]()
+
+    def __reduce__(self):
+        """
+        Позволяет передавать фильтр в другие процессы: вместо скомпилированной функции передаются вид и значение
+        """
+        return VacancyFilter, (self.kind, self.value)
+
+    def get_key(self) -> Tuple[str, str | frozenset]:
+        """
+        Возвращает хэшируемое описание фильтра, по которому кэшируются результаты запросов
+
+        >>> VacancyFilter('substring', 'Аналитик').get_key()
+        ('substring', 'Аналитик')
+        """
+        return self.kind, self.value
+
+    def matches(self, name: str) -> bool:
+        """
+        Подходит ли название вакансии под фильтр
+        :param name: Название вакансии
+        """
+        return bool(self.__match(name))
+
+    def __call__(self, vacancy: Vacancy) -> bool:
+        """
+        Подходит ли вакансия под фильтр, позволяет передавать фильтр в get_vacancies_years
+        :param vacancy: Вакансия
+        """
+        return self.matches(vacancy.get_name())
+
+
+class CsvReader:
+    """
+    Класс для построчного чтения csv файла модулем csv, в том числе из сжатых архивов
+    """
 
-    @profile
     def __init__(self, file_name: str):
         """
-        Инициализирует объект Dataset
+        Инициализирует объект класса CsvReader
         :param file_name: Название файла
+        """
+        self.__file = HelpMethods.open_file(file_name)
+        self.__reader = csv.reader(self.__file, delimiter=",")
+
+    def __enter__(self) -> 'CsvReader':
+        return self
+
+    def __exit__(self, *args):
+        self.__file.close()
+
+    def read_title(self) -> List[str] | None:
+        """
+        Читает заголовок файла
+        :return: Названия столбцов или None, если файл пустой
+        """
+        return next(self.__reader, None)
+
+    def read_rows(self, indexes: List[int], year_index: int = None, stride: int = 1) \
+            -> Iterator[Tuple[List[str] | None, List[str]]]:
+        """
+        Читает строки файла после заголовка
+        :param indexes: Индексы нужных столбцов
+        :param year_index: Индекс столбца с датой, не используется
+        :param stride: Шаг выборки: возвращается каждая stride-я строка. Модуль csv не умеет пропускать строки
+        без разбора, поэтому для быстрого предпросмотра несжатых файлов используется MappedCsvReader
+        :return: Пары из значений нужных столбцов (None, если строка слишком короткая) и самой строки
+        """
+        row_len = max(indexes) + 1
+
+        for row in itertools.islice(self.__reader, 0, None, stride):
+            yield ([row[i] for i in indexes] if len(row) >= row_len else None), row
+
+    @staticmethod
+    def decode_row(row: List[str]) -> List[str]:
+        """
+        Возвращает строку в виде списка значений
+        :param row: Строка, полученная из read_rows
+        """
+        return row
+
+
+class MappedCsvReader:
+    """
+    Класс для чтения csv файла через mmap: границы полей и строк ищутся прямо в байтах,
+    а в str декодируются только нужные столбцы
+    """
+    __quoted_field = re.compile(rb'"[^"]*(?:""[^"]*)*"')
+
+    def __init__(self, file_name: str):
+        """
+        Инициализирует объект класса MappedCsvReader
+        :param file_name: Название несжатого файла
+        """
+        if HelpMethods.get_compression(file_name) is not None:
+            raise ValueError(f'Файл {file_name} сжат, mmap доступен только для несжатых файлов')
+
+        self.__file = open(file_name, mode='rb')
+        self.__buffer = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.path.getsize(file_name) > 0 else b''
+        self.__pos = 3 if self.__buffer[:3] == b'\xef\xbb\xbf' else 0
+
+    def __enter__(self) -> 'MappedCsvReader':
+        return self
+
+    def __exit__(self, *args):
+        if isinstance(self.__buffer, mmap.mmap):
+            self.__buffer.close()
+        self.__file.close()
+
+    def read_title(self) -> List[str] | None:
+        """
+        Читает заголовок файла
+        :return: Названия столбцов или None, если файл пустой
+        """
+        if self.__pos >= len(self.__buffer):
+            return None
+
+        line_end = self.__buffer.find(b'\n', self.__pos)
+        line_end = len(self.__buffer) if line_end == -1 else line_end
+        title = self.decode_row((self.__pos, line_end))
+        self.__pos = line_end + 1
+
+        return title
+
+    def read_rows(self, indexes: List[int], year_index: int = None, stride: int = 1) \
+            -> Iterator[Tuple[List[str] | None, Tuple[int, int]]]:
+        """
+        Читает строки файла после заголовка. Строка без кавычек разбивается на поля одним вызовом bytes.split,
+        записи с кавычками разбираются в __split_quoted, а в str декодируются только нужные столбцы
+        :param indexes: Индексы нужных столбцов
+        :param year_index: Индекс столбца с датой, не используется
+        :param stride: Шаг выборки: возвращается каждая stride-я строка, для остальных ищется только конец записи
+        :return: Пары из значений нужных столбцов (None, если строка слишком короткая) и границ строки в файле
+        """
+        buffer = self.__buffer
+        size = len(buffer)
+        row_len = max(indexes) + 1
+        get_values = operator.itemgetter(*indexes) if len(indexes) > 1 else lambda fields: (fields[indexes[0]],)
+        pos = self.__pos
+        record = -1
+
+        while pos < size:
+            record += 1
+            record_start = pos
+            line_end = buffer.find(b'\n', pos)
+            line_end = size if line_end == -1 else line_end
+
+            if record % stride != 0:
+                if buffer.find(b'"', pos, line_end) != -1:
+                    line_end = MappedCsvReader.__find_record_end(buffer, pos, line_end)
+                pos = line_end + 1
+                continue
+
+            line = buffer[pos:line_end]
+            quoted = b'"' in line
+
+            if not quoted:
+                fields = (line[:-1] if line.endswith(b'\r') else line).split(b',')
+            else:
+                fields, record_end = MappedCsvReader.__split_quoted(buffer, pos, line_end)
+
+                if fields is None:
+                    record_end = MappedCsvReader.__find_record_end(buffer, pos, line_end)
+                    fields = [field.encode('utf-8') for field in self.decode_row((pos, record_end))]
+                    quoted = False
+
+                line_end = record_end
+
+            pos = line_end + 1
+
+            if len(fields) < row_len:
+                yield None, (record_start, min(pos, size))
+                continue
+
+            needed = get_values(fields)
+            joined = b'\0'.join(needed)
+
+            if quoted and b'"' in joined:
+                needed = [MappedCsvReader.__unquote(field) for field in needed]
+                joined = b'\0'.join(needed)
+
+            values = joined.decode('utf-8', errors='replace').split('\0')
+            if len(values) != len(indexes):
+                values = [field.decode('utf-8', errors='replace') for field in needed]
+
+            yield values, (record_start, min(pos, size))
+
+    def decode_row(self, span: Tuple[int, int]) -> List[str]:
+        """
+        Декодирует строку файла целиком
+        :param span: Границы строки в файле
+        :return: Значения всех столбцов строки
+        """
+        text = self.__buffer[span[0]:span[1]].decode('utf-8')
+        return next(csv.reader(io.StringIO(text), delimiter=","), [])
+
+    @staticmethod
+    def __split_quoted(buffer, pos: int, line_end: int) -> Tuple[List[bytes] | None, int]:
+        """
+        Разбивает на поля запись с кавычками. Участки между полями в кавычках делятся по запятым одним вызовом
+        bytes.split, а конец поля в кавычках ищется регулярным выражением, поэтому время разбора не зависит
+        от количества экранированных кавычек
+        :param buffer: Содержимое файла
+        :param pos: Позиция начала записи
+        :param line_end: Позиция конца первой строки записи
+        :return: Поля записи, поля в кавычках возвращаются вместе с кавычками для __unquote, и позиция конца
+        записи. Вместо полей возвращается None, если кавычка открывается не в начале поля или не закрыта
+
+        >>> MappedCsvReader._MappedCsvReader__split_quoted(b'a,"b, ""c""\\n d",e\\r\\nf', 0, 11)
+        ([b'a', b'"b, ""c""\\n d"', b'e'], 18)
+        >>> MappedCsvReader._MappedCsvReader__split_quoted(b'a"b,"c"', 0, 7)
+        (None, 7)
+        """
+        size = len(buffer)
+        fields = []
+
+        while True:
+            quote = buffer.find(b'"', pos, line_end)
+
+            if quote == -1:
+                line = buffer[pos:line_end]
+                fields += (line[:-1] if line.endswith(b'\r') else line).split(b',')
+                return fields, line_end
+
+            if quote > pos:
+                if buffer[quote - 1] != 44:
+                    return None, line_end
+                fields += buffer[pos:quote - 1].split(b',')
+
+            match = MappedCsvReader.__quoted_field.match(buffer, quote)
+
+            if match is None:
+                return None, line_end
+
+            if match.end() > line_end:
+                line_end = buffer.find(b'\n', match.end())
+                line_end = size if line_end == -1 else line_end
+
+            comma = buffer.find(b',', match.end(), line_end)
+
+            if comma == -1:
+                field = buffer[quote:line_end]
+                fields.append(field[:-1] if field.endswith(b'\r') else field)
+                return fields, line_end
+
+            fields.append(buffer[quote:comma])
+            pos = comma + 1
+
+    @staticmethod
+    def __unquote(field: bytes) -> bytes:
+        """
+        Убирает кавычки из поля, полученного из __split_quoted, так же, как модуль csv при чтении файла
+        в текстовом режиме
+        :param field: Поле записи
+        :return: Значение поля
+
+        >>> MappedCsvReader._MappedCsvReader__unquote(b'"b, ""c""\\r\\n d"x')
+        b'b, "c"\\n dx'
+        >>> MappedCsvReader._MappedCsvReader__unquote(b'a"b')
+        b'a"b'
+        """
+        if field[:1] != b'"':
+            return field
+
+        match = MappedCsvReader.__quoted_field.match(field)
+        value = field[1:match.end() - 1].replace(b'""', b'"') + field[match.end():]
+
+        if b'\r' in value:
+            value = value.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+        return value
+
+    @staticmethod
+    def __find_record_end(buffer, pos: int, line_end: int) -> int:
+        """
+        Находит конец записи с учетом переводов строк внутри полей в кавычках. Кавычка открывает поле,
+        только если стоит в его начале, как в модуле csv
+        :param buffer: Содержимое файла
+        :param pos: Позиция начала записи
+        :param line_end: Позиция конца первой строки записи
+        :return: Позиция перевода строки, которым заканчивается запись, или размер файла
+        """
+        size = len(buffer)
+        record_start = pos
+
+        while True:
+            quote = buffer.find(b'"', pos, line_end)
+
+            if quote == -1:
+                return line_end
+
+            if quote != record_start and buffer[quote - 1] != 44:
+                pos = quote + 1
+                continue
+
+            match = MappedCsvReader.__quoted_field.match(buffer, quote)
+            pos = size if match is None else match.end()
+
+            if pos > line_end:
+                line_end = buffer.find(b'\n', pos)
+                line_end = size if line_end == -1 else line_end
+
+
+class DataSet:
+    """Класс, представляющий набор данных обо всех вакансиях"""
+
+    __required_fields = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+
+    __reject_reasons = ['short_row', 'missing_field', 'missing_salary', 'bad_salary', 'unknown_currency', 'bad_date']
+
+    __engines = {
+        'csv': CsvReader,
+        'mmap': MappedCsvReader,
+    }
+
+    @profile
+    def __init__(self, file_name: str | List[str], quarantine_file: str = None, engine: str = 'csv',
+                 cache_size: int = 32, sample_rate: float = 1.0):
+        """
+        Инициализирует объект Dataset. Если передано несколько файлов, они парсятся параллельно
+        в отдельных процессах, а затем объединяются в порядке следования файлов
+        :param file_name: Название файла, список файлов, папка или glob-шаблон
+        :param quarantine_file: Файл, в который записываются отброшенные строки с причиной отказа
+        :param engine: Способ чтения файлов: csv - модулем csv, mmap - сканированием байтов без декодирования
+        ненужных столбцов
+        :param cache_size: Максимальное количество закэшированных результатов запросов
+        :param sample_rate: Доля строк для приближенного режима: читается каждая round(1 / sample_rate)-я строка
+        каждого файла, а количества вакансий по годам масштабируются обратно к размеру файла
 
         >>> type(DataSet('tests/test.csv')).__name__
         'DataSet'
@@ -221,28 +696,269 @@ class DataSet:
         self.__vacancies_years: Dict[int, List[Vacancy]] = {}
         self.__vacancies_areas: Dict[str, List[Vacancy]] = {}
         self.__len = 0
+        self.__rejected: Dict[str, int] = dict.fromkeys(DataSet.__reject_reasons, 0)
+        self.__cache_size = cache_size
+        self.__cache: OrderedDict = OrderedDict()
+        self.__cache_lock = threading.Lock()
+        self.__cache_generation = 0
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+
+        if engine not in DataSet.__engines:
+            raise ValueError(f'Неизвестный способ чтения: {engine}')
+
+        if not 0 < sample_rate <= 1:
+            raise ValueError(f'Доля выборки должна быть в интервале (0, 1]: {sample_rate}')
+
+        self.__stride = DataSet.get_stride(sample_rate)
+        self.__sample_rate = 1 / self.__stride
+
+        files = HelpMethods.get_files(file_name)
 
-        with open(file_name, mode='r', encoding='utf-8-sig') as vacancies:
-            file_reader = csv.reader(vacancies, delimiter=",")
-            has_title = False
+        if len(files) == 1:
+            self.__read_file(files[0], quarantine_file, engine)
+            return
 
-            for row in file_reader:
-                if not has_title:
-                    self.__title = row
-                    has_title = True
+        quarantine_parts = [None] * len(files) if quarantine_file is None \
+            else [f'{quarantine_file}.{i}' for i in range(len(files))]
+
+        with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as executor:
+            for shard_name, shard in zip(files, executor.map(DataSet, files, quarantine_parts, [engine] * len(files), [0] * len(files),
+                                                      [sample_rate] * len(files))):
+                self.__merge(shard, shard_name)
+
+        if quarantine_file is not None:
+            self.__join_quarantine(quarantine_file, quarantine_parts)
+
+    def append(self, file_name: str | List[str], quarantine_file: str = None, engine: str = 'csv'):
+        """
+        Дочитывает в датасет вакансии из других файлов и сбрасывает кэш запросов
+        :param file_name: Название файла, список файлов, папка или glob-шаблон
+        :param quarantine_file: Файл, в который записываются отброшенные строки с причиной отказа
+        :param engine: Способ чтения файлов
+        """
+        self.__merge(DataSet(file_name, quarantine_file, engine, 0, self.__sample_rate), str(file_name))
+
+        with self.__cache_lock:
+            self.__cache.clear()
+            self.__cache_generation += 1
+
+    def __getstate__(self) -> dict:
+        """
+        Возвращает состояние объекта для передачи между процессами без блокировки кэша
+        :return: Словарь атрибутов
+        """
+        state = self.__dict__.copy()
+        del state['_DataSet__cache_lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Восстанавливает состояние объекта и создает новую блокировку кэша
+        :param state: Словарь атрибутов
+        """
+        self.__dict__.update(state)
+        self.__cache_lock = threading.Lock()
+
+    def get_cache_info(self) -> Dict[str, int]:
+        """
+        Возвращает статистику кэша запросов
+        :return: Словарь с количеством попаданий, промахов и закэшированных результатов
+        """
+        return {
+            'hits': self.__cache_hits,
+            'misses': self.__cache_misses,
+            'size': len(self.__cache),
+        }
+
+    def get_rejected(self) -> Dict[str, int]:
+        """
+        Возвращает количество отброшенных строк по причинам отказа
+        :return: Словарь с ключами-причинами и значениями - количеством строк
+        """
+        return dict(self.__rejected)
+
+    def __read_file(self, file_name: str, quarantine_file: str = None, engine: str = 'csv'):
+        """
+        Читает вакансии из одного csv файла
+        :param file_name: Название файла
+        :param quarantine_file: Файл для отброшенных строк
+        :param engine: Способ чтения файла
+        """
+        with DataSet.__engines[engine](file_name) as reader:
+            self.__title = reader.read_title()
+
+            if self.__title is None:
+                return
+
+            indexes = self.__get_indexes(file_name)
+            quarantine = None if quarantine_file is None \
+                else open(quarantine_file, mode='w', encoding='utf-8', newline='')
+
+            start = len(self.__vacancies_objects)
+
+            try:
+                quarantine_writer = None if quarantine is None else csv.writer(quarantine)
+                if quarantine_writer is not None:
+                    quarantine_writer.writerow(self.__title + ['reject_reason'])
+
+                for values, row in reader.read_rows(indexes, indexes[-1], self.__stride):
+                    reason = self.__validate_vacancy(values)
+
+                    if reason is not None and quarantine_writer is not None:
+                        quarantine_writer.writerow(reader.decode_row(row) + [reason])
+            finally:
+                if quarantine is not None:
+                    quarantine.close()
+
+        self.__set_salaries(self.__vacancies_objects[start:])
+
+    @staticmethod
+    def __set_salaries(vacancies: List[Vacancy]):
+        """
+        Вычисляет зарплаты в рублях для прочитанных вакансий одной векторной операцией по уже очищенным
+        и разобранным значениям оклада
+        :param vacancies: Вакансии
+        """
+        if len(vacancies) == 0:
+            return
+
+        salaries_from, salaries_to, currencies = zip(*(vacancy.get_salary_values() for vacancy in vacancies))
+        converted = Salary.convert(salaries_from, salaries_to, currencies).tolist()
+
+        for vacancy, salary in zip(vacancies, converted):
+            vacancy.set_salary(salary)
+
+    def __get_indexes(self, file_name: str) -> List[int]:
+        """
+        Вычисляет индексы обязательных столбцов по заголовку файла
+        :param file_name: Название файла
+        :return: Индексы обязательных столбцов
+        """
+        missing = [field for field in DataSet.__required_fields if field not in self.__title]
+
+        if len(missing) != 0:
+            raise ValueError(f'В файле {file_name} нет обязательных столбцов: {", ".join(missing)}')
+
+        return [self.__title.index(field) for field in DataSet.__required_fields]
+
+    def __merge(self, shard: 'DataSet', file_name: str):
+        """
+        Добавляет в датасет вакансии из датасета, прочитанного из другого файла. Индексы по годам и городам
+        переносятся списками целиком, без обхода отдельных вакансий. Основная цена шардирования - передача
+        вакансий шарда из процесса через pickle (около 0.6 с на 100 тысяч строк)
+        :param shard: Датасет, прочитанный из отдельного файла
+        :param file_name: Название файла, из которого прочитан датасет
+        """
+        if shard.__title is None:
+            return
+
+        if self.__title is None:
+            self.__title = shard.__title
+        elif shard.__title != self.__title:
+            raise ValueError(f'Заголовок файла {file_name} не совпадает с заголовком датасета')
+
+        self.__vacancies_objects.extend(shard.__vacancies_objects)
+
+        for year, vacancies in shard.__vacancies_years.items():
+            self.__vacancies_years.setdefault(year, []).extend(vacancies)
+
+        for area, vacancies in shard.__vacancies_areas.items():
+            self.__vacancies_areas.setdefault(area, []).extend(vacancies)
+
+        self.__len += shard.__len
+
+        for reason, count in shard.__rejected.items():
+            self.__rejected[reason] += count
+
+    def __join_quarantine(self, quarantine_file: str, parts: List[str]):
+        """
+        Объединяет файлы отброшенных строк, записанные отдельными процессами, в один файл
+        :param quarantine_file: Итоговый файл
+        :param parts: Файлы, записанные отдельными процессами
+        """
+        with open(quarantine_file, mode='w', encoding='utf-8', newline='') as quarantine:
+            writer = csv.writer(quarantine)
+            writer.writerow((self.__title or []) + ['reject_reason'])
+
+            for part in parts:
+                if not os.path.exists(part):
                     continue
 
-                if row.count('') != 0 or len(row) < len(self.__title) - 1: continue
+                with open(part, mode='r', encoding='utf-8', newline='') as rows:
+                    reader = csv.reader(rows)
+                    next(reader, None)
+                    writer.writerows(reader)
+
+                os.remove(part)
+
+    def __validate_vacancy(self, values: List[str] | None) -> str | None:
+        """
+        Проверяет значения обязательных столбцов строки и добавляет вакансию в датасет
+        :param values: Значения обязательных столбцов или None, если строка слишком короткая
+        :return: Причина, по которой строка отброшена, или None
+        """
+        reason = DataSet.__get_reject_reason(values)
+
+        if reason is None:
+            try:
+                vacancy = Vacancy(values, DataSet.__required_fields)
+            except ValueError:
+                reason = 'bad_salary'
+            else:
+                salary_from, salary_to, _ = vacancy.get_salary_values()
+                reason = None if math.isfinite(salary_from) and math.isfinite(salary_to) else 'bad_salary'
 
-                self.__validate_vacancy(row)
+            if reason is None:
+                self.__add_vacancy(vacancy)
                 self.__len += 1
+                return None
 
-    def __validate_vacancy(self, row: List[str]):
+        self.__rejected[reason] += 1
+        return reason
+
+    @staticmethod
+    def __get_reject_reason(values: List[str] | None) -> str | None:
+        """
+        Находит причину, по которой строку нельзя превратить в вакансию. Валюта и дата проверяются так же,
+        как их читает Vacancy: после удаления html тегов и лишних пробелов
+        :param values: Значения обязательных столбцов или None, если строка слишком короткая
+        :return: Причина отказа или None, если строка валидна
+
+        >>> DataSet._DataSet__get_reject_reason(['Программист', '10', '20', 'RUR', 'Москва', '2022-07-17'])
+        >>> DataSet._DataSet__get_reject_reason(None)
+        'short_row'
+        >>> DataSet._DataSet__get_reject_reason(['Программист', '', '20', 'RUR', 'Москва', '2022-07-17'])
+        'missing_salary'
+        >>> DataSet._DataSet__get_reject_reason(['Программист', '10', '20', 'ABC', 'Москва', '2022-07-17'])
+        'unknown_currency'
+        >>> DataSet._DataSet__get_reject_reason(['Программист', '10', '20', 'RUR', 'Москва', 'вчера'])
+        'bad_date'
+        >>> DataSet._DataSet__get_reject_reason(['Программист', '10', '20', ' <b>rur</b>', 'Москва', ' 2021-01-01'])
+        """
+        if values is None:
+            return 'short_row'
+
+        name, salary_from, salary_to, salary_currency, area_name, published_at = values
+
+        if salary_from == '' or salary_to == '':
+            return 'missing_salary'
+        if name == '' or area_name == '':
+            return 'missing_field'
+        if not Salary.has_currency(salary_currency) \
+                and not Salary.has_currency(HelpMethods.delete_rubbish(salary_currency)):
+            return 'unknown_currency'
+        if not published_at[:4].isdecimal() and not HelpMethods.delete_rubbish(published_at)[:4].isdecimal():
+            return 'bad_date'
+
+        return None
+
+    def __add_vacancy(self, vacancy: Vacancy):
         """
-        Парсит валидную строку csv файла
-        :param row: Строка
+        Добавляет вакансию в датасет
+        :param vacancy: Вакансия
         """
-        vacancy = Vacancy(row, self.__title)
+        self.__vacancies_objects.append(vacancy)
 
         now_date = self.__vacancies_years.get(vacancy.get_date(), [])
         now_date.append(vacancy)
@@ -255,12 +971,116 @@ class DataSet:
     def get_vacancies_years(self, func=None) -> Dict[int, List[int]]:
         """
         Создает словарь с ключами-годами и значениями - массивами из зарплат в соответствии с фильтрующей
-        функцией
+        функцией. Результаты без фильтра и с VacancyFilter кэшируются
+        :param func: Фильтрующая функция или VacancyFilter
+        :return: Словарь с массивами зарплат по годам
+        """
+        if func is None or isinstance(func, VacancyFilter):
+            key = ('years', None if func is None else func.get_key())
+            return self.__get_cached(key, self.__compute_vacancies_years, func)
+
+        return self.__compute_vacancies_years(func)
+
+    def get_vacancies_cities(self) -> Tuple[List[List[float]], List[List[int]]]:
+        """
+        Создает кортеж из листов с долями вакансий и уровнем зарплат по городам
+        :return: Кортеж из листов с долями вакансий и уровнем зарплат по городам
+        """
+        return self.__get_cached(('cities', None), self.__compute_vacancies_cities)
+
+    def get_vacancies_statistics(self, vacancy_filter: VacancyFilter = None) \
+            -> Tuple[Dict[int, List[int]], Dict[int, List[int]], List[List[float]], List[List[int]]]:
+        """
+        Вычисляет статистику по годам для всех и для отфильтрованных вакансий, а также статистику по городам
+        за один проход по датасету
+        :param vacancy_filter: Фильтр вакансий, если не задан - отфильтрованными считаются все вакансии
+        :return: Кортеж из словарей с зарплатами по годам для всех и отфильтрованных вакансий,
+        листов с долями вакансий и уровнем зарплат по городам
+        """
+        key = ('statistics', None if vacancy_filter is None else vacancy_filter.get_key())
+        return self.__get_cached(key, self.__compute_vacancies_statistics, vacancy_filter)
+
+    def get_vacancies_errors(self, vacancy_filter: VacancyFilter = None, z: float = 1.96) \
+            -> Tuple[Dict[int, List[float]], Dict[int, List[float]], Dict[str, float], Dict[str, int]]:
+        """
+        Вычисляет полуширину доверительных интервалов для результатов get_vacancies_statistics в приближенном
+        режиме. Для полного датасета все интервалы нулевые
+        :param vacancy_filter: Фильтр вакансий
+        :param z: Квантиль нормального распределения, 1.96 соответствует уровню доверия 95%
+        :return: Кортеж из словарей с ключами-годами и значениями - погрешностями средней зарплаты и количества
+        для всех и отфильтрованных вакансий, а также словарей погрешностей долей вакансий и зарплат по городам
+        """
+        key = ('errors', None if vacancy_filter is None else vacancy_filter.get_key(), z)
+        return self.__get_cached(key, self.__compute_vacancies_errors, vacancy_filter, z)
+
+    def get_sample_rate(self) -> float:
+        """Возвращает фактическую долю строк, по которой построен датасет: 1 / шаг выборки"""
+        return self.__sample_rate
+
+    def get_vacancies(self) -> List[Vacancy]:
+        """Возвращает все вакансии датасета в порядке чтения"""
+        return list(self.__vacancies_objects)
+
+    @staticmethod
+    def get_stride(sample_rate: float) -> int:
+        """
+        Вычисляет шаг выборки строк по доле строк
+        :param sample_rate: Доля строк
+        :return: Шаг выборки
+
+        >>> DataSet.get_stride(0.3)
+        3
+        >>> DataSet.get_stride(1.0)
+        1
+        """
+        return max(1, round(1 / sample_rate))
+
+    def __get_cached(self, key: tuple, func: Callable, *args):
+        """
+        Возвращает копию результата запроса из кэша или вычисляет его, вытесняя самые давно использованные
+        результаты. Кэш защищен блокировкой, так как запросы могут выполняться из нескольких потоков,
+        сам результат вычисляется вне блокировки. Если за время вычисления append сбросил кэш (изменилось
+        поколение кэша), результат возвращается, но не сохраняется
+        :param key: Метод, описание фильтра и параметры запроса
+        :param func: Функция для вычисления результата
+        :param args: Аргументы функции
+        :return: Результат запроса
+        """
+        with self.__cache_lock:
+            generation = self.__cache_generation
+            cached = self.__cache.get(key)
+
+            if cached is not None:
+                self.__cache.move_to_end(key)
+                self.__cache_hits += 1
+            else:
+                self.__cache_misses += 1
+
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        result = func(*args)
+
+        if self.__cache_size > 0:
+            cached = copy.deepcopy(result)
+
+            with self.__cache_lock:
+                if self.__cache_generation == generation:
+                    self.__cache[key] = cached
+
+                while len(self.__cache) > self.__cache_size:
+                    self.__cache.popitem(last=False)
+
+        return result
+
+    def __compute_vacancies_years(self, func=None) -> Dict[int, List[int]]:
+        """
+        Вычисляет словарь с массивами зарплат по годам в соответствии с фильтрующей функцией
         :param func: Фильтрующая функция
         :return: Словарь с массивами зарплат по годам
         """
         if func is None:
-            return DataSet.get_structured_salaries(self.__vacancies_years)
+            return DataSet.get_structured_salaries(self.__vacancies_years, self.__stride)
 
         result = {}
 
@@ -270,27 +1090,143 @@ class DataSet:
                 if func(vacancy):
                     result[year].append(vacancy)
 
-        return DataSet.get_structured_salaries(result)
+        return DataSet.get_structured_salaries(result, self.__stride)
 
-    def get_vacancies_cities(self) -> Tuple[List[List[float]], List[List[int]]]:
+    def __compute_vacancies_cities(self) -> Tuple[List[List[float]], List[List[int]]]:
+        """
+        Вычисляет кортеж из листов с долями вакансий и уровнем зарплат по городам
+        :return: Кортеж из листов с долями вакансий и уровнем зарплат по городам
+        """
+        areas = {}
+
+        for key, value in self.__vacancies_areas.items():
+            summ = 0
+            for vacancy in value:
+                summ += vacancy.get_salary()
+
+            areas[key] = [summ, len(value)]
+
+        return DataSet.get_structured_cities(areas, self.__len)
+
+    def __compute_vacancies_statistics(self, vacancy_filter: VacancyFilter = None) \
+            -> Tuple[Dict[int, List[int]], Dict[int, List[int]], List[List[float]], List[List[int]]]:
+        """
+        Вычисляет статистику по годам для всех и отфильтрованных вакансий и статистику по городам за один проход
+        :param vacancy_filter: Фильтр вакансий
+        :return: Кортеж со статистикой по годам и городам
+        """
+        matches = vacancy_filter.matches if vacancy_filter is not None else None
+        years_all: Dict[int, List[float]] = {}
+        years_filtered: Dict[int, List[float]] = {}
+        areas: Dict[str, List[float]] = {}
+
+        for vacancy in self.__vacancies_objects:
+            salary = vacancy.get_salary()
+            year = vacancy.get_date()
+
+            year_all = years_all.get(year)
+            if year_all is None:
+                year_all = years_all[year] = [0, 0]
+                years_filtered[year] = [0, 0]
+
+            year_all[0] += salary
+            year_all[1] += 1
+
+            if matches is None or matches(vacancy.get_name()):
+                year_filtered = years_filtered[year]
+                year_filtered[0] += salary
+                year_filtered[1] += 1
+
+            area = areas.get(vacancy.get_area())
+            if area is None:
+                area = areas[vacancy.get_area()] = [0, 0]
+
+            area[0] += salary
+            area[1] += 1
+
+        fract, cities_s = DataSet.get_structured_cities(areas, self.__len)
+
+        return DataSet.get_structured_years(years_all, self.__stride), \
+            DataSet.get_structured_years(years_filtered, self.__stride), fract, cities_s
+
+    def __compute_vacancies_errors(self, vacancy_filter: VacancyFilter, z: float) \
+            -> Tuple[Dict[int, List[float]], Dict[int, List[float]], Dict[str, float], Dict[str, int]]:
+        """
+        Вычисляет погрешности статистики по годам и городам за один проход по выборке
+        :param vacancy_filter: Фильтр вакансий
+        :param z: Квантиль нормального распределения
+        :return: Кортеж с погрешностями статистики по годам и городам
+        """
+        matches = vacancy_filter.matches if vacancy_filter is not None else None
+        years_all: Dict[int, List[float]] = {}
+        years_filtered: Dict[int, List[float]] = {}
+        areas: Dict[str, List[float]] = {}
+
+        for vacancy in self.__vacancies_objects:
+            salary = vacancy.get_salary()
+            year = vacancy.get_date()
+
+            if year not in years_all:
+                years_all[year] = [0, 0, 0]
+                years_filtered[year] = [0, 0, 0]
+
+            groups = [years_all[year], areas.setdefault(vacancy.get_area(), [0, 0, 0])]
+            if matches is None or matches(vacancy.get_name()):
+                groups.append(years_filtered[year])
+
+            for group in groups:
+                group[0] += 1
+                group[1] += salary
+                group[2] += salary * salary
+
+        correction = math.sqrt(1 - 1 / self.__stride)
+        errors_all = {year: self.__get_errors(group, z, correction)[:2] for year, group in years_all.items()}
+        errors_filtered = {year: self.__get_errors(group, z, correction)[:2] for year, group in years_filtered.items()}
+        errors_areas = {area: self.__get_errors(group, z, correction) for area, group in areas.items()}
+
+        return errors_all, errors_filtered, \
+            {area: round(errors[2], 4) for area, errors in errors_areas.items()}, \
+            {area: errors[0] for area, errors in errors_areas.items()}
+
+    def __get_errors(self, group: List[float], z: float, correction: float) -> List[float]:
+        """
+        Вычисляет погрешности средней зарплаты, количества и доли вакансий группы
+        :param group: Количество вакансий, сумма и сумма квадратов зарплат в группе
+        :param z: Квантиль нормального распределения
+        :param correction: Поправка на конечность генеральной совокупности
+        :return: Погрешности средней зарплаты, количества вакансий и доли вакансий
+        """
+        count, summ, squares = group
+        fraction = count / self.__len if self.__len > 0 else 0
+        fraction_error = z * math.sqrt(fraction * (1 - fraction) / self.__len) * correction if self.__len > 0 else 0
+
+        if count > 1:
+            variance = max(0, (squares - summ * summ / count) / (count - 1))
+            salary_error = z * math.sqrt(variance / count) * correction
+        else:
+            salary_error = 0
+
+        return [round(salary_error), round(fraction_error * self.__len * self.__stride), fraction_error]
+
+    @staticmethod
+    def get_structured_cities(areas: Dict[str, List[float]], length: int) \
+            -> Tuple[List[List[float]], List[List[int]]]:
         """
         Создает кортеж из листов с долями вакансий и уровнем зарплат по городам
+        :param areas: Словарь с ключами-городами и значениями - суммой зарплат и количеством вакансий
+        :param length: Количество вакансий в датасете
         :return: Кортеж из листов с долями вакансий и уровнем зарплат по городам
         """
         cities_s = []
         fract = []
 
-        for key, value in self.__vacancies_areas.items():
+        for key, (summ, count) in areas.items():
 
-            percent = round(len(value) / self.__len, 4)
+            percent = round(count / length, 4)
             if percent < 0.01:
                 continue
 
-            summ = 0
-            for vacancy in self.__vacancies_areas[key]:
-                summ += vacancy.get_salary()
-
-            cities_s.append([key, math.floor(summ / len(value))])
+            cities_s.append([key, math.floor(summ / count)])
             fract.append([key, percent])
 
         fract.sort(key=lambda x: x[1], reverse=True)
@@ -299,10 +1235,11 @@ class DataSet:
         return fract, cities_s
 
     @staticmethod
-    def get_structured_salaries(vacancies: Dict[int, List[Vacancy]]) -> Dict[int, List[int]]:
+    def get_structured_salaries(vacancies: Dict[int, List[Vacancy]], scale: int = 1) -> Dict[int, List[int]]:
         """
         Создает словарь с ключами-годами и значениями - массивами из зарплат
         :param vacancies: Датасет вакансий
+        :param scale: Множитель количества вакансий для выборки
         :return: Словарь с ключами-годами и значениями - массивами из зарплат
         """
         salaries = {}
@@ -315,11 +1252,272 @@ class DataSet:
 
             salaries[year] = [
                 math.floor(summ / len(vacancies[year])) if len(vacancies[year]) > 0 else 0,
-                len(vacancies[year])
+                len(vacancies[year]) * scale
             ]
 
         return salaries
 
+    @staticmethod
+    def get_structured_years(years: Dict[int, List[float]], scale: int = 1) -> Dict[int, List[int]]:
+        """
+        Создает словарь с ключами-годами и значениями - массивами из средней зарплаты и количества вакансий
+        :param years: Словарь с ключами-годами и значениями - суммой зарплат и количеством вакансий
+        :param scale: Множитель количества вакансий для выборки
+        :return: Словарь с ключами-годами и значениями - массивами из зарплат
+        """
+        return {
+            year: [math.floor(summ / count) if count > 0 else 0, count * scale]
+            for year, (summ, count) in years.items()
+        }
+
+
+class SharedDataSet:
+    """
+    Класс, представляющий столбцы датасета, опубликованные в разделяемой памяти. Процесс-владелец публикует
+    датасет один раз, а рабочие процессы подключаются к нему по имени и читают столбцы без копирования
+
+    Разделяемая память содержит заголовок из 8 int64, столбцы зарплат (float64), годов, индексов названий и
+    индексов городов (int32), смещения строк (int64) и закодированные в utf-8 уникальные названия и города
+    """
+    __header_size = 8
+
+    __tracker_lock = threading.Lock()
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        """
+        Инициализирует объект класса SharedDataSet поверх блока разделяемой памяти
+        :param memory: Блок разделяемой памяти
+        :param owner: Является ли процесс владельцем блока
+        """
+        self.__memory = memory
+        self.__owner = owner
+
+        header = np.ndarray((SharedDataSet.__header_size,), dtype=np.int64, buffer=memory.buf)
+        length, names_count, areas_count, names_size, areas_size, stride = header[:6].tolist()
+        self.__len = length
+        self.__stride = stride
+
+        offset = SharedDataSet.__header_size * 8
+        self.__salaries, offset = SharedDataSet.__get_array(memory, offset, np.float64, length)
+        self.__names_offsets, offset = SharedDataSet.__get_array(memory, offset, np.int64, names_count + 1)
+        self.__areas_offsets, offset = SharedDataSet.__get_array(memory, offset, np.int64, areas_count + 1)
+        self.__years, offset = SharedDataSet.__get_array(memory, offset, np.int32, length)
+        self.__names_indexes, offset = SharedDataSet.__get_array(memory, offset, np.int32, length)
+        self.__areas_indexes, offset = SharedDataSet.__get_array(memory, offset, np.int32, length)
+
+        self.__names = SharedDataSet.__decode(memory, offset, self.__names_offsets)
+        self.__areas = SharedDataSet.__decode(memory, offset + names_size, self.__areas_offsets)
+
+    @staticmethod
+    def publish(dataset: DataSet) -> 'SharedDataSet':
+        """
+        Публикует столбцы датасета в новый блок разделяемой памяти. Блок создается под той же блокировкой,
+        под которой attach подменяет resource_tracker.register, иначе регистрация блока может потеряться
+        :param dataset: Датасет
+        :return: Объект-владелец, который должен вызвать unlink после завершения рабочих процессов
+        """
+        vacancies = dataset.get_vacancies()
+        names: Dict[str, int] = {}
+        areas: Dict[str, int] = {}
+
+        names_indexes = [names.setdefault(vacancy.get_name(), len(names)) for vacancy in vacancies]
+        areas_indexes = [areas.setdefault(vacancy.get_area(), len(areas)) for vacancy in vacancies]
+        names_blob, names_offsets = SharedDataSet.__encode(names)
+        areas_blob, areas_offsets = SharedDataSet.__encode(areas)
+
+        columns = [
+            np.array([vacancy.get_salary() for vacancy in vacancies], dtype=np.float64),
+            names_offsets,
+            areas_offsets,
+            np.array([vacancy.get_date() for vacancy in vacancies], dtype=np.int32),
+            np.array(names_indexes, dtype=np.int32),
+            np.array(areas_indexes, dtype=np.int32),
+        ]
+
+        header = np.array([
+            len(vacancies), len(names), len(areas), len(names_blob), len(areas_blob),
+            DataSet.get_stride(dataset.get_sample_rate()), 0, 0
+        ], dtype=np.int64)
+
+        size = header.nbytes + sum(column.nbytes for column in columns) + len(names_blob) + len(areas_blob)
+        with SharedDataSet.__tracker_lock:
+            memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+        offset = 0
+        for part in [header.tobytes()] + [column.tobytes() for column in columns] + [names_blob, areas_blob]:
+            memory.buf[offset:offset + len(part)] = part
+            offset += len(part)
+
+        return SharedDataSet(memory, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> 'SharedDataSet':
+        """
+        Подключается к опубликованному датасету из любого процесса. Блок не регистрируется в resource_tracker
+        подключившегося процесса, иначе независимый процесс удалит блок при своем завершении, а дочерние
+        процессы, использующие resource_tracker владельца, снимут с него регистрацию
+        :param name: Имя блока разделяемой памяти
+        :return: Объект для чтения датасета
+        """
+        if sys.version_info >= (3, 13):
+            return SharedDataSet(shared_memory.SharedMemory(name=name, track=False), owner=False)
+
+        with SharedDataSet.__tracker_lock:
+            register = resource_tracker.register
+            resource_tracker.register = lambda resource, rtype: \
+                None if rtype == 'shared_memory' else register(resource, rtype)
+
+            try:
+                memory = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+        return SharedDataSet(memory, owner=False)
+
+    def get_name(self) -> str:
+        """Возвращает имя блока разделяемой памяти для передачи рабочим процессам"""
+        return self.__memory.name
+
+    def close(self):
+        """
+        Отключается от разделяемой памяти. Массивы, полученные из объекта, после этого использовать нельзя
+        """
+        self.__salaries = self.__years = self.__names_indexes = self.__areas_indexes = None
+        self.__names_offsets = self.__areas_offsets = None
+        self.__memory.close()
+
+    def unlink(self):
+        """
+        Удаляет блок разделяемой памяти, вызывается владельцем после завершения рабочих процессов
+        """
+        if not self.__owner:
+            raise ValueError('Удалить разделяемую память может только процесс, который ее создал')
+
+        self.__memory.unlink()
+
+    def __enter__(self) -> 'SharedDataSet':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+        if self.__owner:
+            self.unlink()
+
+    def get_vacancies_years(self, vacancy_filter: VacancyFilter = None) -> Dict[int, List[int]]:
+        """
+        Создает словарь с ключами-годами и значениями - массивами из зарплат, как DataSet.get_vacancies_years
+        :param vacancy_filter: Фильтр вакансий
+        :return: Словарь с массивами зарплат по годам
+        """
+        return self.get_vacancies_statistics(vacancy_filter)[1]
+
+    def get_vacancies_cities(self) -> Tuple[List[List[float]], List[List[int]]]:
+        """
+        Создает кортеж из листов с долями вакансий и уровнем зарплат по городам, как DataSet.get_vacancies_cities
+        :return: Кортеж из листов с долями вакансий и уровнем зарплат по городам
+        """
+        return DataSet.get_structured_cities(self.__get_areas(), self.__len)
+
+    def get_vacancies_statistics(self, vacancy_filter: VacancyFilter = None) \
+            -> Tuple[Dict[int, List[int]], Dict[int, List[int]], List[List[float]], List[List[int]]]:
+        """
+        Вычисляет статистику по годам и городам, как DataSet.get_vacancies_statistics. Суммы считаются
+        через np.bincount, который складывает значения в порядке строк, поэтому результаты совпадают с DataSet
+        :param vacancy_filter: Фильтр вакансий
+        :return: Кортеж со статистикой по годам и городам
+        """
+        years, codes = self.__get_years_codes()
+        years_all = SharedDataSet.__sum_groups(years, codes, self.__salaries)
+
+        if vacancy_filter is None:
+            years_filtered = years_all
+        else:
+            matched = np.array([vacancy_filter.matches(name) for name in self.__names], dtype=bool)
+            mask = matched[self.__names_indexes] if len(matched) > 0 else np.zeros(self.__len, dtype=bool)
+            years_filtered = SharedDataSet.__sum_groups(years, codes[mask], self.__salaries[mask])
+
+        fract, cities_s = DataSet.get_structured_cities(self.__get_areas(), self.__len)
+
+        return DataSet.get_structured_years(years_all, self.__stride), \
+            DataSet.get_structured_years(years_filtered, self.__stride), fract, cities_s
+
+    def __get_years_codes(self) -> Tuple[List[int], np.ndarray]:
+        """
+        Нумерует годы в порядке их первого появления в датасете
+        :return: Кортеж из списка годов и массива номеров года для каждой вакансии
+        """
+        unique, first, inverse = np.unique(self.__years, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind='stable')
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+
+        return unique[order].tolist(), ranks[inverse]
+
+    def __get_areas(self) -> Dict[str, List[float]]:
+        """
+        Вычисляет сумму зарплат и количество вакансий по городам
+        :return: Словарь с ключами-городами и значениями - суммой зарплат и количеством вакансий
+        """
+        return SharedDataSet.__sum_groups(self.__areas, self.__areas_indexes, self.__salaries)
+
+    @staticmethod
+    def __sum_groups(keys: List, codes: np.ndarray, salaries: np.ndarray) -> Dict:
+        """
+        Суммирует зарплаты и считает количество вакансий по группам
+        :param keys: Ключи групп
+        :param codes: Номер группы для каждой вакансии
+        :param salaries: Зарплаты
+        :return: Словарь с ключами групп и значениями - суммой зарплат и количеством вакансий
+        """
+        sums = np.bincount(codes, weights=salaries, minlength=len(keys)).tolist()
+        counts = np.bincount(codes, minlength=len(keys)).tolist()
+
+        return {key: [summ, count] for key, summ, count in zip(keys, sums, counts)}
+
+    @staticmethod
+    def __get_array(memory: shared_memory.SharedMemory, offset: int, dtype, count: int) -> Tuple[np.ndarray, int]:
+        """
+        Создает массив только для чтения поверх разделяемой памяти без копирования
+        :param memory: Блок разделяемой памяти
+        :param offset: Смещение массива
+        :param dtype: Тип элементов
+        :param count: Количество элементов
+        :return: Кортеж из массива и смещения следующего массива
+        """
+        array = np.ndarray((count,), dtype=dtype, buffer=memory.buf, offset=offset)
+        array.flags.writeable = False
+
+        return array, offset + array.nbytes
+
+    @staticmethod
+    def __encode(values: Dict[str, int]) -> Tuple[bytes, np.ndarray]:
+        """
+        Кодирует уникальные строки в один массив байт
+        :param values: Словарь с ключами-строками в порядке их номеров
+        :return: Кортеж из байт и смещений начала каждой строки
+        """
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64) if encoded else []
+
+        return b''.join(encoded), offsets
+
+    @staticmethod
+    def __decode(memory: shared_memory.SharedMemory, offset: int, offsets: np.ndarray) -> List[str]:
+        """
+        Декодирует уникальные строки из разделяемой памяти
+        :param memory: Блок разделяемой памяти
+        :param offset: Смещение начала байт
+        :param offsets: Смещения начала каждой строки
+        :return: Список строк
+        """
+        bounds = offsets.tolist()
+        return [
+            bytes(memory.buf[offset + start:offset + end]).decode('utf-8')
+            for start, end in zip(bounds, bounds[1:])
+        ]
+
 
 class InputConnect:
     """
@@ -329,6 +1527,7 @@ class InputConnect:
         file_name (str): Название файла
         vacancy (str): Название профессии для фильтрации
         method (str): Метод вывода данных
+        sample_rate (float): Доля строк, по которой строится приближенная статистика
     """
 
     def __init__(self):
@@ -338,6 +1537,7 @@ class InputConnect:
         self.file_name = None
         self.vacancy = None
         self.method = None
+        self.sample_rate = 1.0
 
     def read_console(self):
         """
@@ -356,26 +1556,73 @@ class InputConnect:
         self.vacancy = input("Введите название профессии: ")
         self.method = input("Вакансии или статистика: ")
 
+        try:
+            sample_rate = input("Доля строк для предпросмотра (пусто - все строки): ")
+        except EOFError:
+            sample_rate = ''
+
+        self.sample_rate = InputConnect.parse_sample_rate(sample_rate)
+
     @staticmethod
-    def write_console(s_all, s_filtered, fract, cities_s):
+    def parse_sample_rate(value: str) -> float:
+        """
+        Разбирает введенную долю строк для предпросмотра
+        :param value: Введенная строка, пустая строка означает все строки
+        :return: Доля строк от 0 (не включительно) до 1
+
+        >>> InputConnect.parse_sample_rate('')
+        1.0
+        >>> InputConnect.parse_sample_rate(' 0,1 ')
+        0.1
+        """
+        value = value.strip().replace(',', '.')
+
+        if value == '':
+            return 1.0
+
+        try:
+            sample_rate = float(value)
+        except ValueError:
+            sample_rate = None
+
+        if sample_rate is None or not 0 < sample_rate <= 1:
+            raise ValueError(f'Доля строк должна быть числом от 0 до 1, получено {value!r}')
+
+        return sample_rate
+
+    @staticmethod
+    def write_console(s_all, s_filtered, fract, cities_s, errors=None):
         """
         Метод для вывода вакансий в консоль
         :param s_all: Словарь с ключами-годами и значениями - массивами из зарплат
         :param s_filtered: Словарь с ключами-годами и значениями - массивами из зарплат для выбранной профессии
         :param fract: Доли вакансий по городам
         :param cities_s: Средние зарплаты по городам
+        :param errors: Погрешности из DataSet.get_vacancies_errors для приближенного режима
         """
-        InputConnect.__write_salaries(s_all)
-        InputConnect.__write_salaries(s_filtered, ' для выбранной профессии')
+        errors_all, errors_filtered, errors_fract, errors_cities = errors if errors is not None else [None] * 4
+
+        InputConnect.__write_salaries(s_all, errors=errors_all)
+        InputConnect.__write_salaries(s_filtered, ' для выбранной профессии', errors_filtered)
+
+        InputConnect.__write_salaries_cities(fract, cities_s, errors_fract, errors_cities)
 
-        InputConnect.__write_salaries_cities(fract, cities_s)
+    @staticmethod
+    def write_rejected(rejected: Dict[str, int]):
+        """
+        Выводит в консоль количество отброшенных строк по причинам
+        :param rejected: Словарь с ключами-причинами и значениями - количеством строк
+        """
+        reasons = ', '.join(f'{reason}: {count}' for reason, count in rejected.items() if count != 0)
+        print(f'Отброшено строк: {sum(rejected.values())}' + (f' ({reasons})' if reasons else ''))
 
     @staticmethod
-    def __write_salaries(salaries: Dict[str, List[int]], sufix=''):
+    def __write_salaries(salaries: Dict[str, List[int]], sufix='', errors: Dict[str, List[float]] = None):
         """
         Выводит в консоль словарь с ключами-годами и значениями - массивами из зарплат
         :param salaries: Словарь с ключами-годами и значениями - массивами из зарплат
         :param sufix: Доп параметр для печати
+        :param errors: Погрешности зарплат и количества вакансий по годам
         """
         s = f'Динамика уровня зарплат по годам{sufix}' + ': {'
 
@@ -385,7 +1632,7 @@ class InputConnect:
             if i != 0:
                 print(', ', end='')
 
-            print(f'{year}: {salaries[year][0]}', end='')
+            print(f'{year}: {salaries[year][0]}' + InputConnect.__format_error(errors, year, 0), end='')
 
         print('}')
 
@@ -397,22 +1644,25 @@ class InputConnect:
             if i != 0:
                 print(', ', end='')
 
-            print(f'{year}: {salaries[year][1]}', end='')
+            print(f'{year}: {salaries[year][1]}' + InputConnect.__format_error(errors, year, 1), end='')
 
         print('}')
 
     @staticmethod
-    def __write_salaries_cities(fract: List[List[float]], cities_s: List[List[int]]):
+    def __write_salaries_cities(fract: List[List[float]], cities_s: List[List[int]],
+                                errors_fract: Dict[str, float] = None, errors_cities: Dict[str, int] = None):
         """
         Выводит уровень зарплат и доли вакансий по городам в консоль
         :param fract: Доля вакансий по городам
         :param cities_s: Средние зарплаты по городам
+        :param errors_fract: Погрешности долей вакансий по городам
+        :param errors_cities: Погрешности средних зарплат по городам
         """
         print('Уровень зарплат по городам (в порядке убывания): {', end='')
         for i, e in enumerate(cities_s[:10]):
             if i != 0:
                 print(', ', end='')
-            print(f"'{e[0]}': {e[1]}", end='')
+            print(f"'{e[0]}': {e[1]}" + InputConnect.__format_error(errors_cities, e[0]), end='')
 
         print('}')
 
@@ -420,15 +1670,36 @@ class InputConnect:
         for i, e in enumerate(fract[:10]):
             if i != 0:
                 print(', ', end='')
-            print(f"'{e[0]}': {e[1]}", end='')
+            print(f"'{e[0]}': {e[1]}" + InputConnect.__format_error(errors_fract, e[0]), end='')
 
         print('}')
 
+    @staticmethod
+    def __format_error(errors: Dict, key, index: int = None) -> str:
+        """
+        Форматирует погрешность значения для вывода в консоль
+        :param errors: Словарь с погрешностями или None
+        :param key: Год или город
+        :param index: Индекс погрешности в массиве, если значения словаря - массивы
+        :return: Строка вида ' ± погрешность' или пустая строка
+
+        >>> InputConnect._InputConnect__format_error({2022: [150, 10]}, 2022, 0)
+        ' ± 150'
+        >>> InputConnect._InputConnect__format_error(None, 2022, 0)
+        ''
+        """
+        if errors is None or key not in errors:
+            return ''
+
+        return f' ± {errors[key] if index is None else errors[key][index]}'
+
 
 class HelpMethods:
     """
     Класс, содержащий в себе вспомогатильные функции которые могут быть переиспользованы
     """
+    __dataset_file = re.compile(r'\.csv(\.(gz|bz2|xz|zst))?$', re.IGNORECASE)
+
     @staticmethod
     def delete_rubbish(s: str) -> str:
         """
@@ -447,6 +1718,86 @@ class HelpMethods:
 
         return ' '.join(re.sub(rubbish_html, '', s).split()).strip()
 
+    @staticmethod
+    def get_files(file_name: str | List[str]) -> List[str]:
+        """
+        Получает список файлов датасета. Из папки берутся только csv файлы, в том числе сжатые
+        (.csv.gz, .csv.bz2, .csv.xz, .csv.zst), чтобы посторонние файлы вроде README не ломали загрузку
+        :param file_name: Название файла, список файлов, папка или glob-шаблон
+        :return: Список названий файлов
+
+        >>> HelpMethods.get_files('tests/test.csv')
+        ['tests/test.csv']
+        >>> HelpMethods.get_files(['a.csv', 'b.csv'])
+        ['a.csv', 'b.csv']
+        >>> HelpMethods.get_files('tests/*.csv')
+        ['tests/test.csv']
+        >>> HelpMethods.get_files('tests')
+        ['tests/test.csv']
+        """
+        if not isinstance(file_name, str):
+            files = list(file_name)
+        elif os.path.isdir(file_name):
+            files = sorted(
+                path for path in glob.glob(os.path.join(file_name, '*'))
+                if os.path.isfile(path) and HelpMethods.__dataset_file.search(path)
+            )
+        elif not os.path.exists(file_name) and re.search(r'[*?\[]', file_name):
+            files = sorted(glob.glob(file_name))
+        else:
+            files = [file_name]
+
+        if len(files) == 0:
+            raise ValueError(f'Не найдено ни одного файла по пути {file_name}')
+
+        return files
+
+    @staticmethod
+    def get_compression(file_name: str) -> str | None:
+        """
+        Определяет формат сжатия файла по первым байтам
+        :param file_name: Название файла
+        :return: gzip, bz2, xz, zstd или None для несжатого файла
+
+        >>> HelpMethods.get_compression('tests/test.csv')
+        """
+        with open(file_name, mode='rb') as file:
+            magic = file.read(6)
+
+        if magic.startswith(b'\x1f\x8b'):
+            return 'gzip'
+        if magic.startswith(b'BZh'):
+            return 'bz2'
+        if magic.startswith(b'\xfd7zXZ\x00'):
+            return 'xz'
+        if magic.startswith(b'\x28\xb5\x2f\xfd'):
+            return 'zstd'
+
+        return None
+
+    @staticmethod
+    def open_file(file_name: str) -> io.TextIOBase:
+        """
+        Открывает csv файл на чтение, потоково распаковывая gzip, bz2, xz и zstd архивы.
+        Формат архива определяется по первым байтам файла, а не по расширению
+        :param file_name: Название файла
+        :return: Текстовый поток с содержимым файла
+        """
+        compression = HelpMethods.get_compression(file_name)
+
+        if compression == 'gzip':
+            return gzip.open(file_name, mode='rt', encoding='utf-8-sig')
+        if compression == 'bz2':
+            return bz2.open(file_name, mode='rt', encoding='utf-8-sig')
+        if compression == 'xz':
+            return lzma.open(file_name, mode='rt', encoding='utf-8-sig')
+        if compression == 'zstd':
+            if zstandard is None:
+                raise ImportError('Для чтения zstd архивов необходим пакет zstandard')
+            return zstandard.open(file_name, mode='rt', encoding='utf-8-sig')
+
+        return open(file_name, mode='r', encoding='utf-8-sig')
+
     @staticmethod
     def refactor_label(label: str) -> str:
         """
@@ -464,12 +1815,27 @@ class HelpMethods:
 class report:
     """
     Класс для представления различных видов отчетов
+
+    Сгенерированные файлы записываются в манифест вместе с хэшем входных данных. Если входные данные,
+    шаблон и стили не изменились, а файл отчета не был изменен после генерации, он используется повторно.
+    При изменении способа отрисовки отчетов нужно увеличить __render_version
     """
+    __cache_file = '.report_cache.json'
+
+    __render_version = 1
+
+    __dependencies = {
+        'report.xlsx': [],
+        'graph.png': [],
+        'report.pdf': ['template.html', 'style.css', 'graph.png'],
+    }
+
     def __init__(self, vacancy: str,
                  s_all: Dict[int, List[int]],
                  s_filtered: Dict[int, List[int]],
                  fract: List[List[float]],
-                 cities_s: List[List[int]]):
+                 cities_s: List[List[int]],
+                 use_cache: bool = True):
         """
         Инициализирует объект класса report
         :param vacancy: Вакансия, по которой была произведена фильтрация
@@ -477,7 +1843,10 @@ class report:
         :param s_filtered: Словарь с ключами-годами и значениями - массивами из зарплат для выбранной профессии
         :param fract: Доли вакансий по городам
         :param cities_s: Средние зарплаты по городам
+        :param use_cache: Использовать ли ранее сгенерированные файлы с теми же входными данными
         """
+        self.__use_cache = use_cache
+        self.__cache_hits: Dict[str, bool] = {}
         self.__salaries_all = s_all
         self.__salaries_filtered = s_filtered
         self.__fraction = fract
@@ -505,10 +1874,21 @@ class report:
             'Доля вакансий по городам',
         ]
 
+    def get_cache_hits(self) -> Dict[str, bool]:
+        """
+        Возвращает для каждого сгенерированного файла, был ли он взят из кэша
+        :return: Словарь с ключами-названиями файлов и значениями - попаданием в кэш
+        """
+        return dict(self.__cache_hits)
+
     def generate_excel(self):
         """
         Метод для генерации excel отчета
         """
+        key = self.__get_cache_key('report.xlsx')
+        if self.__is_cached('report.xlsx', key):
+            return
+
         wb = Workbook()
 
         ws1 = wb.active
@@ -518,11 +1898,22 @@ class report:
         report.__make_ws2(ws2, self.__fraction, self.__cities_salaries, self.__names_ws2)
 
         wb.save('report.xlsx')
+        self.__save_cache('report.xlsx', key)
 
     def generate_image(self):
         """
-        Метод для генерации графиков
+        Метод для генерации графиков. Если графики взяты из кэша, показывается сохраненное изображение
         """
+        key = self.__get_cache_key('graph.png')
+        if self.__is_cached('graph.png', key):
+            fig, ax = plt.subplots()
+            ax.imshow(plt.imread('graph.png'))
+            ax.axis('off')
+            fig.tight_layout(pad=0)
+
+            plt.show()
+            return
+
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(nrows=2, ncols=2)
 
         self.__create_bar(
@@ -550,6 +1941,7 @@ class report:
         fig.set_size_inches(8, 6)
         fig.set_dpi(300)
         fig.savefig('graph.png', dpi=300)
+        self.__save_cache('graph.png', key)
 
         plt.show()
 
@@ -557,6 +1949,10 @@ class report:
         """
         Метод для генерации отчета в формате pdf
         """
+        key = self.__get_cache_key('report.pdf')
+        if self.__is_cached('report.pdf', key):
+            return
+
         env = Environment(loader=FileSystemLoader('.'))
         template = env.get_template("template.html")
         config = pdfkit.configuration(wkhtmltopdf='/usr/local/bin/wkhtmltopdf')
@@ -574,6 +1970,101 @@ class report:
 
         pdf_template = template.render(context)
         pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": None})
+        self.__save_cache('report.pdf', key)
+
+    def __get_cache_key(self, file_name: str) -> str:
+        """
+        Вычисляет хэш входных данных отчета, версии отрисовки, версий библиотек и файлов, от которых он зависит
+        :param file_name: Название файла отчета
+        :return: Хэш
+        """
+        data = json.dumps([
+            file_name,
+            report.__render_version,
+            matplotlib.__version__,
+            openpyxl.__version__,
+            self.__vacancy,
+            list(self.__salaries_all.items()),
+            list(self.__salaries_filtered.items()),
+            self.__fraction,
+            self.__cities_salaries,
+            [report.__get_file_hash(dependency) for dependency in report.__dependencies[file_name]],
+        ], ensure_ascii=False)
+
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def __is_cached(self, file_name: str, key: str) -> bool:
+        """
+        Проверяет, что файл отчета уже сгенерирован по тем же входным данным и не был изменен
+        :param file_name: Название файла отчета
+        :param key: Хэш входных данных
+        :return: Можно ли использовать существующий файл
+        """
+        manifest = report.__read_manifest()
+        entry = manifest.get(file_name, {})
+
+        hit = self.__use_cache and entry.get('key') == key \
+            and entry.get('content') == report.__get_file_hash(file_name)
+        self.__cache_hits[file_name] = hit
+
+        if hit:
+            entry['cache_hit'] = True
+            report.__write_manifest(manifest)
+
+        return hit
+
+    def __save_cache(self, file_name: str, key: str):
+        """
+        Записывает в манифест хэши входных данных и содержимого сгенерированного файла
+        :param file_name: Название файла отчета
+        :param key: Хэш входных данных
+        """
+        manifest = report.__read_manifest()
+        manifest[file_name] = {
+            'key': key,
+            'content': report.__get_file_hash(file_name),
+            'cache_hit': False,
+        }
+
+        report.__write_manifest(manifest)
+
+    @staticmethod
+    def __read_manifest() -> Dict[str, Dict]:
+        """
+        Читает манифест сгенерированных файлов
+        :return: Словарь с ключами-названиями файлов
+        """
+        try:
+            with open(report.__cache_file, mode='r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def __write_manifest(manifest: Dict[str, Dict]):
+        """
+        Записывает манифест сгенерированных файлов
+        :param manifest: Словарь с ключами-названиями файлов
+        """
+        with open(report.__cache_file, mode='w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=4)
+
+    @staticmethod
+    def __get_file_hash(file_name: str) -> str | None:
+        """
+        Вычисляет хэш содержимого файла
+        :param file_name: Название файла
+        :return: Хэш или None, если файла нет
+        """
+        if not os.path.exists(file_name):
+            return None
+
+        digest = hashlib.sha256()
+        with open(file_name, mode='rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+
+        return digest.hexdigest()
 
     @staticmethod
     def __generate_rows_1(s_all: Dict[int, List[int]], s_filtered: Dict[int, List[int]]) -> List[Dict[str, str | int]]:
@@ -826,11 +2317,14 @@ def main():
     connect = InputConnect()
     connect.read_console()
 
-    dataset = DataSet(connect.file_name)
+    preview = DataSet.get_stride(connect.sample_rate) > 1 and all(
+        HelpMethods.get_compression(file) is None for file in HelpMethods.get_files(connect.file_name)
+    )
+    dataset = DataSet(connect.file_name, engine='mmap' if preview else 'csv', sample_rate=connect.sample_rate)
+    vacancy_filter = VacancyFilter('substring', connect.vacancy)
 
-    salaries_all = dataset.get_vacancies_years()
-    salaries_filtered = dataset.get_vacancies_years(lambda x: x.is_suitible(connect.vacancy))
-    fraction, cities_salaries = dataset.get_vacancies_cities()
+    salaries_all, salaries_filtered, fraction, cities_salaries = dataset.get_vacancies_statistics(vacancy_filter)
+    connect.write_rejected(dataset.get_rejected())
 
     rep = report(connect.vacancy,
                  salaries_all,
@@ -840,7 +2334,8 @@ def main():
                  )
 
     if connect.method.lower() == 'статистика':
-        connect.write_console(salaries_all, salaries_filtered, fraction, cities_salaries)
+        errors = dataset.get_vacancies_errors(vacancy_filter) if dataset.get_sample_rate() < 1 else None
+        connect.write_console(salaries_all, salaries_filtered, fraction, cities_salaries, errors)
         rep.generate_excel()
     else:
         rep.generate_excel()
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import re
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Callable
+from urllib.parse import urlsplit, parse_qs
+
+from program import DataSet, VacancyFilter, report
+
+
+class ReportService:
+    """
+    Класс, представляющий локальный сервис отчетов, который один раз загружает датасет и держит его в памяти
+
+    Attributes:
+        file_name (str): Название файла, список файлов, папка или glob-шаблон датасета
+        cache_size (int): Максимальное количество закэшированных ответов
+    """
+    __artifacts = {
+        'xlsx': ('report.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+        'png': ('graph.png', 'image/png'),
+        'pdf': ('report.pdf', 'application/pdf'),
+    }
+
+    __statuses = {
+        200: 'OK',
+        400: 'Bad Request',
+        404: 'Not Found',
+        405: 'Method Not Allowed',
+        500: 'Internal Server Error',
+    }
+
+    def __init__(self, file_name: str, cache_size: int = 32):
+        """
+        Инициализирует объект класса ReportService
+        :param file_name: Название файла, список файлов, папка или glob-шаблон датасета
+        :param cache_size: Максимальное количество закэшированных ответов
+        """
+        self.file_name = file_name
+        self.cache_size = cache_size
+        self.__dataset = None
+        self.__version = 0
+        self.__cache: OrderedDict = OrderedDict()
+        self.__render_lock = asyncio.Lock()
+
+    def get_version(self) -> int:
+        """Возвращает версию загруженного датасета"""
+        return self.__version
+
+    async def load(self):
+        """
+        Загружает датасет в отдельном потоке и увеличивает его версию
+        """
+        loop = asyncio.get_running_loop()
+        self.__dataset = await loop.run_in_executor(None, DataSet, self.file_name)
+        self.__version += 1
+
+    async def get_statistics(self, vacancy: str | List[str], kind: str = 'substring') \
+            -> Tuple[Dict[int, List[int]], Dict[int, List[int]], List[List[float]], List[List[int]]]:
+        """
+        Вычисляет статистику по годам и городам для профессии
+        :param vacancy: Название профессии или список названий для фильтра names
+        :param kind: Вид фильтра вакансий
+        :return: Кортеж со статистикой, как у DataSet.get_vacancies_statistics
+        """
+        return await self.__get_statistics(self.__version, self.__dataset, vacancy, kind)
+
+    async def get_artifact(self, vacancy: str | List[str], extension: str, kind: str = 'substring') -> bytes:
+        """
+        Генерирует отчет для профессии
+        :param vacancy: Название профессии или список названий для фильтра names
+        :param extension: Формат отчета: xlsx, png или pdf
+        :param kind: Вид фильтра вакансий
+        :return: Содержимое файла отчета
+        """
+        version = self.__version
+        statistics = await self.__get_statistics(version, self.__dataset, vacancy, kind)
+
+        return await self.__get_cached(
+            (version, extension) + VacancyFilter(kind, vacancy).get_key(),
+            ReportService.__render,
+            vacancy if isinstance(vacancy, str) else ', '.join(vacancy),
+            statistics,
+            extension,
+            lock=self.__render_lock
+        )
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080, socket_path: str = None) -> asyncio.AbstractServer:
+        """
+        Загружает датасет и запускает сервер
+        :param host: Адрес
+        :param port: Порт
+        :param socket_path: Путь к unix сокету, если задан - сервер слушает его вместо порта
+        :return: Запущенный сервер
+        """
+        await self.load()
+
+        if socket_path is not None:
+            return await asyncio.start_unix_server(self.handle, path=socket_path)
+
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080, socket_path: str = None):
+        """
+        Запускает сервер и обслуживает запросы до остановки процесса
+        :param host: Адрес
+        :param port: Порт
+        :param socket_path: Путь к unix сокету
+        """
+        server = await self.start(host, port, socket_path)
+
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Обрабатывает один http запрос
+        :param reader: Поток чтения
+        :param writer: Поток записи
+        """
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            if len(request_line) < 2:
+                status, content_type, body = ReportService.__json_response(400, {'error': 'Некорректный запрос'})
+            else:
+                status, content_type, body = await self.__route(request_line[0], request_line[1])
+        except Exception as e:
+            status, content_type, body = ReportService.__json_response(500, {'error': str(e)})
+
+        writer.write(
+            f'HTTP/1.1 {status} {ReportService.__statuses[status]}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: close\r\n\r\n'.encode('latin-1') + body
+        )
+
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def __route(self, method: str, target: str) -> Tuple[int, str, bytes]:
+        """
+        Выбирает обработчик по пути запроса
+        :param method: Http метод
+        :param target: Путь с параметрами запроса
+        :return: Кортеж из статуса, типа содержимого и тела ответа
+        """
+        url = urlsplit(target)
+        values = parse_qs(url.query)
+        params = {key: value[0] for key, value in values.items()}
+
+        if url.path == '/reload':
+            if method != 'POST':
+                return ReportService.__json_response(405, {'error': 'Ожидается POST запрос'})
+
+            await self.load()
+            return ReportService.__json_response(200, {'version': self.__version})
+
+        if method != 'GET':
+            return ReportService.__json_response(405, {'error': 'Ожидается GET запрос'})
+
+        extension = url.path[len('/report.'):] if url.path.startswith('/report.') else None
+
+        if url.path != '/stats' and extension not in ReportService.__artifacts:
+            return ReportService.__json_response(404, {'error': f'Неизвестный путь {url.path}'})
+
+        if 'vacancy' not in params:
+            return ReportService.__json_response(400, {'error': 'Не задан параметр vacancy'})
+
+        kind = params.get('filter', 'substring')
+        # Для фильтра names каждый параметр vacancy - отдельное название, так как названия могут содержать запятые
+        vacancy = values['vacancy'] if kind == 'names' else params['vacancy']
+
+        try:
+            if extension is not None:
+                body = await self.get_artifact(vacancy, extension, kind)
+                return 200, ReportService.__artifacts[extension][1], body
+
+            s_all, s_filtered, fract, cities_s = await self.get_statistics(vacancy, kind)
+        except (ValueError, re.error) as e:
+            return ReportService.__json_response(400, {'error': str(e)})
+
+        return ReportService.__json_response(200, {
+            'version': self.__version,
+            'vacancy': vacancy,
+            'salaries_all': s_all,
+            'salaries_filtered': s_filtered,
+            'fraction': fract,
+            'cities_salaries': cities_s,
+        })
+
+    async def __get_statistics(self, version: int, dataset: DataSet, vacancy: str | List[str], kind: str) \
+            -> Tuple[Dict[int, List[int]], Dict[int, List[int]], List[List[float]], List[List[int]]]:
+        """
+        Вычисляет статистику для профессии по датасету, версия которого зафиксирована в начале запроса,
+        чтобы перезагрузка во время запроса не смешивала результаты разных версий
+        :param version: Версия датасета
+        :param dataset: Датасет этой версии
+        :param vacancy: Название профессии или список названий для фильтра names
+        :param kind: Вид фильтра вакансий
+        :return: Кортеж со статистикой, как у DataSet.get_vacancies_statistics
+        """
+        vacancy_filter = VacancyFilter(kind, vacancy)
+
+        return await self.__get_cached(
+            (version, 'statistics') + vacancy_filter.get_key(),
+            dataset.get_vacancies_statistics,
+            vacancy_filter
+        )
+
+    async def __get_cached(self, key: tuple, func: Callable, *args, lock: asyncio.Lock = None):
+        """
+        Возвращает результат из кэша или вычисляет его в отдельном потоке, вытесняя самые давно
+        использованные результаты
+        :param key: Ключ кэша
+        :param func: Функция для вычисления результата
+        :param args: Аргументы функции
+        :param lock: Блокировка, под которой выполняется функция
+        :return: Результат функции
+        """
+        if key in self.__cache:
+            self.__cache.move_to_end(key)
+            return self.__cache[key]
+
+        loop = asyncio.get_running_loop()
+
+        if lock is None:
+            result = await loop.run_in_executor(None, func, *args)
+        else:
+            async with lock:
+                result = await loop.run_in_executor(None, func, *args)
+
+        self.__cache[key] = result
+
+        while len(self.__cache) > self.cache_size:
+            self.__cache.popitem(last=False)
+
+        return result
+
+    @staticmethod
+    def __render(vacancy: str, statistics: tuple, extension: str) -> bytes:
+        """
+        Генерирует файл отчета и читает его содержимое
+        :param vacancy: Название профессии
+        :param statistics: Статистика по годам и городам
+        :param extension: Формат отчета
+        :return: Содержимое файла отчета
+        """
+        rep = report(vacancy, *statistics)
+
+        if extension == 'xlsx':
+            rep.generate_excel()
+        else:
+            rep.generate_image()
+            plt.close('all')
+
+        if extension == 'pdf':
+            rep.generate_pdf()
+
+        with open(ReportService.__artifacts[extension][0], mode='rb') as file:
+            return file.read()
+
+    @staticmethod
+    def __json_response(status: int, data: dict) -> Tuple[int, str, bytes]:
+        """
+        Формирует ответ в формате json
+        :param status: Http статус
+        :param data: Данные ответа
+        :return: Кортеж из статуса, типа содержимого и тела ответа
+        """
+        return status, 'application/json; charset=utf-8', json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сервис статистики и отчетов по вакансиям')
+    parser.add_argument('file_name', help='Файл, папка или glob-шаблон с вакансиями')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--socket', default=None, help='Путь к unix сокету вместо порта')
+    parser.add_argument('--cache-size', type=int, default=32)
+    args = parser.parse_args()
+
+    service = ReportService(args.file_name, args.cache_size)
+    asyncio.run(service.serve(args.host, args.port, args.socket))
+
+
+if __name__ == '__main__':
+    main()
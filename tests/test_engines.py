@@ -0,0 +1,325 @@
+import csv
+import gzip
+import os
+import random
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from program import VacancyFilter, DataSet, SharedDataSet, CsvReader, MappedCsvReader
+
+
+ROWS = int(os.environ.get('ENGINES_TESTS_ROWS', 10000))
+TIMING = os.environ.get('ENGINES_TESTS_TIMING') == '1'
+SHARDS = 4
+SEED = 2022
+
+TITLE = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary_from',
+         'salary_to', 'salary_gross', 'salary_currency', 'area_name', 'published_at']
+NAMES = ['Программист', 'Аналитик', 'Руководитель группы разработки', 'Тестировщик', 'Программист "Python", senior',
+         'Системный аналитик', 'DevOps-инженер', 'Data Scientist']
+AREAS = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород', 'Ростов-на-Дону',
+         'Краснодар', 'Самара', 'Уфа', 'Алматы', 'Минск', 'Ташкент'] + [f'Поселок {i}' for i in range(40)]
+CURRENCIES = ['AZN', 'BYR', 'EUR', 'GEL', 'KGS', 'KZT', 'RUR', 'UAH', 'USD', 'UZS', 'usd', 'XYZ', '']
+FILTERS = [
+    VacancyFilter('substring', 'Программист'),
+    VacancyFilter('regex', 'аналитик$'),
+    VacancyFilter('names', ['Тестировщик', 'Data Scientist']),
+]
+
+
+def add_noise(value: str, rnd: random.Random) -> str:
+    """
+    Оборачивает значение в html теги и лишние пробелы, которые удаляет HelpMethods.delete_rubbish
+    """
+    return rnd.choice([
+        value,
+        value,
+        f'<strong>{value}</strong>',
+        f'  {value}   ',
+        f'<p>{value.replace(" ", "  <br> ")}</p>',
+    ])
+
+
+def generate_html_description(rnd: random.Random) -> str:
+    """
+    Генерирует описание в виде html с атрибутами в кавычках, которые в csv экранируются удвоением
+    """
+    return ''.join(
+        f'<p class="text-{i}"><a href="https://hh.ru/vacancy/{rnd.randint(1, 10 ** 6)}" target="_blank">'
+        f'"Ссылка" {i}</a></p>'
+        for i in range(rnd.randint(5, 40))
+    )
+
+
+def generate_description(rnd: random.Random) -> str:
+    """
+    Генерирует описание вакансии, в большинстве случаев - html с атрибутами в кавычках, как в реальных данных
+    """
+    paragraphs = [
+        '<p><strong>Обязанности:</strong></p> <ul> <li>Разработка, "поддержка", сопровождение</li> </ul>',
+        'Работа в команде,\r\nгибкий график',
+        '<p>Условия: ДМС, офис; "печеньки"</p>\n<p>Удаленка</p>',
+        'x' * rnd.randint(0, 1000),
+    ]
+    description = ' '.join(rnd.choice(paragraphs) for _ in range(rnd.randint(0, 6)))
+
+    return description + generate_html_description(rnd) if rnd.random() < 0.8 else description
+
+
+def get_scan_time(reader_class, file_name: str, stride: int = 1, repeat: int = 5) -> float:
+    """
+    Замеряет время чтения нужных датасету столбцов каждой stride-й строки файла, лучшее из repeat запусков
+    """
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+
+        with reader_class(file_name) as reader:
+            title = reader.read_title()
+            indexes = [title.index(field) for field in ['name', 'salary_from', 'salary_to', 'salary_currency',
+                                                        'area_name', 'published_at']]
+            for _ in reader.read_rows(indexes, title.index('published_at'), stride):
+                pass
+
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def generate_rows(count: int, seed: int):
+    """
+    Генерирует строки csv файла с вакансиями, в том числе невалидные
+    """
+    rnd = random.Random(seed)
+
+    for _ in range(count):
+        salary_from = rnd.choice([rnd.randint(1, 300) * 1000, rnd.randint(1, 3000) * 100.5])
+        row = [
+            add_noise(rnd.choice(NAMES), rnd) if rnd.random() > 0.01 else '',
+            generate_description(rnd),
+            '\n'.join(rnd.sample(['SQL', 'Python', 'Git', 'Linux', 'Docker'], rnd.randint(0, 3))),
+            rnd.choice(['noExperience', 'between1And3', 'between3And6', 'moreThan6']),
+            rnd.choice(['TRUE', 'FALSE']),
+            rnd.choice(['ПМЦ Авангард', 'ООО "Рога, копыта"', '']),
+            str(float(salary_from)) if rnd.random() > 0.03 else rnd.choice(['', 'не указана']),
+            str(float(salary_from + rnd.randint(0, 100) * 1000)) if rnd.random() > 0.03 else '',
+            rnd.choice(['TRUE', 'FALSE', '']),
+            rnd.choice(CURRENCIES),
+            add_noise(rnd.choice(AREAS[:13]) if rnd.random() < 0.9 else rnd.choice(AREAS), rnd),
+            f'{rnd.randint(2007, 2022)}-{rnd.randint(1, 12):02}-{rnd.randint(1, 28):02}T10:00:00+0300'
+            if rnd.random() > 0.01 else 'вчера',
+        ]
+
+        if rnd.random() < 0.01:
+            row = row[:rnd.randint(0, len(row) - 1)]
+
+        yield row
+
+
+def write_csv(file_name: str, rows, encoding: str = 'utf-8-sig'):
+    with open(file_name, mode='w', encoding=encoding, newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(TITLE)
+        writer.writerows(rows)
+
+
+def get_shared_statistics(name: str, vacancy_filter: VacancyFilter):
+    with SharedDataSet.attach(name) as shared:
+        return shared.get_vacancies_statistics(vacancy_filter)
+
+
+def get_results(dataset: DataSet) -> list:
+    """
+    Собирает результаты всех запросов к датасету
+    """
+    return [
+        dataset.get_vacancies_years(),
+        dataset.get_vacancies_cities(),
+        dataset.get_rejected(),
+    ] + [dataset.get_vacancies_years(vacancy_filter) for vacancy_filter in FILTERS] \
+        + [dataset.get_vacancies_statistics(vacancy_filter) for vacancy_filter in FILTERS]
+
+
+class Fixture:
+    """
+    Сгенерированные файлы и датасеты, общие для всех тестов модуля
+    """
+    directory = None
+    file_name = None
+    gzip_name = None
+    shards_directory = None
+    datasets = {}
+    times = {}
+    expected = None
+
+
+def setUpModule():
+    Fixture.directory = tempfile.TemporaryDirectory()
+    rows = list(generate_rows(ROWS, SEED))
+
+    Fixture.file_name = os.path.join(Fixture.directory.name, 'vacancies.csv')
+    write_csv(Fixture.file_name, rows)
+
+    Fixture.shards_directory = os.path.join(Fixture.directory.name, 'shards')
+    os.mkdir(Fixture.shards_directory)
+    size = len(rows) // SHARDS + 1
+    for i in range(SHARDS):
+        write_csv(os.path.join(Fixture.shards_directory, f'{i}.csv'), rows[i * size:(i + 1) * size], 'utf-8')
+
+    Fixture.gzip_name = os.path.join(Fixture.directory.name, 'vacancies.csv.gz')
+    with open(Fixture.file_name, mode='rb') as source, gzip.open(Fixture.gzip_name, mode='wb') as target:
+        target.write(source.read())
+
+    for engine, args in {
+        'csv': [Fixture.file_name],
+        'mmap': [Fixture.file_name, None, 'mmap'],
+        'gzip': [Fixture.gzip_name],
+        'shards': [Fixture.shards_directory],
+        'shards_mmap': [Fixture.shards_directory, None, 'mmap'],
+    }.items():
+        start = time.perf_counter()
+        Fixture.datasets[engine] = DataSet(*args)
+        Fixture.times[engine] = time.perf_counter() - start
+
+    Fixture.expected = get_results(Fixture.datasets['csv'])
+
+
+def tearDownModule():
+    Fixture.directory.cleanup()
+
+
+class TestEngines(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = Fixture.directory
+        self.file_name = Fixture.file_name
+        self.datasets = Fixture.datasets
+        self.expected = Fixture.expected
+
+    def test_generated_data_is_not_trivial(self):
+        rejected = self.datasets['csv'].get_rejected()
+        self.assertGreater(len(self.datasets['csv'].get_vacancies()), ROWS // 2)
+        self.assertTrue(all(count > 0 for count in rejected.values()))
+        self.assertGreater(len(self.expected[1][0]), 10)
+
+    def test_mmap(self):
+        self.assertEqual(get_results(self.datasets['mmap']), self.expected)
+
+    def test_gzip(self):
+        self.assertEqual(get_results(self.datasets['gzip']), self.expected)
+
+    def test_shards(self):
+        self.assertEqual(get_results(self.datasets['shards']), self.expected)
+
+    def test_shards_mmap(self):
+        self.assertEqual(get_results(self.datasets['shards_mmap']), self.expected)
+
+    def test_full_sample(self):
+        self.assertEqual(get_results(DataSet(self.file_name, engine='mmap', sample_rate=1.0)), self.expected)
+
+    def test_sample_same_rows(self):
+        self.assertEqual(get_results(DataSet(self.file_name, engine='mmap', sample_rate=0.1)),
+                         get_results(DataSet(self.file_name, sample_rate=0.1)))
+
+    def test_function_filter(self):
+        dataset = self.datasets['csv']
+        self.assertEqual(dataset.get_vacancies_years(lambda x: x.is_suitible('Программист')),
+                         dataset.get_vacancies_statistics(FILTERS[0])[1])
+
+    def test_cached_results(self):
+        dataset = DataSet(self.file_name, engine='mmap')
+        self.assertEqual(get_results(dataset), get_results(dataset))
+        self.assertGreater(dataset.get_cache_info()['hits'], 0)
+
+    def test_quarantine(self):
+        files = []
+        for engine in ['csv', 'mmap']:
+            quarantine_file = os.path.join(self.directory.name, f'rejected_{engine}.csv')
+            DataSet(self.file_name, quarantine_file, engine)
+            with open(quarantine_file, mode='r', encoding='utf-8') as file:
+                files.append(file.read())
+
+        self.assertEqual(files[0], files[1])
+
+    def test_shared(self):
+        dataset = self.datasets['csv']
+
+        with SharedDataSet.publish(dataset) as shared:
+            self.assertEqual(shared.get_vacancies_years(), dataset.get_vacancies_years())
+            self.assertEqual(shared.get_vacancies_cities(), dataset.get_vacancies_cities())
+
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(get_shared_statistics, [shared.get_name()] * len(FILTERS), FILTERS))
+
+        self.assertEqual(results, [dataset.get_vacancies_statistics(vacancy_filter) for vacancy_filter in FILTERS])
+
+
+@unittest.skipUnless(TIMING, 'замеры времени включаются переменной окружения ENGINES_TESTS_TIMING=1')
+class TestEnginesPerformance(unittest.TestCase):
+    """
+    Тесты с замерами времени. Загрузки датасета идут под cProfile и сильно шумят, поэтому движки сравниваются
+    по лучшему из нескольких запусков чтения без построения датасета
+    """
+
+    def setUp(self) -> None:
+        self.file_name = Fixture.file_name
+        self.times = Fixture.times
+
+    def test_load_time(self):
+        for engine, elapsed in self.times.items():
+            with self.subTest(engine=engine):
+                self.assertLess(elapsed / ROWS * 10000, 5.0)
+
+    def test_mmap_not_slower(self):
+        self.assertLess(get_scan_time(MappedCsvReader, self.file_name), get_scan_time(CsvReader, self.file_name))
+
+    def test_statistics_single_pass(self):
+        dataset = DataSet(self.file_name, engine='mmap', cache_size=0)
+
+        start = time.perf_counter()
+        dataset.get_vacancies_statistics(FILTERS[0])
+        fused = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dataset.get_vacancies_years()
+        dataset.get_vacancies_years(lambda x: x.is_suitible('Программист'))
+        dataset.get_vacancies_cities()
+        separate = time.perf_counter() - start
+
+        self.assertLess(fused, separate * 1.5)
+
+    def test_cache_hit(self):
+        dataset = DataSet(self.file_name, engine='mmap')
+
+        start = time.perf_counter()
+        dataset.get_vacancies_statistics(FILTERS[1])
+        miss = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dataset.get_vacancies_statistics(FILTERS[1])
+        hit = time.perf_counter() - start
+
+        self.assertLess(hit, miss)
+
+    def test_mmap_not_slower_on_quoted_html(self):
+        rnd = random.Random(SEED)
+        rows = list(generate_rows(ROWS, SEED))
+        for row in rows:
+            if len(row) > 1:
+                row[1] = generate_html_description(rnd)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'quoted.csv')
+            write_csv(file_name, rows)
+
+            self.assertLess(get_scan_time(MappedCsvReader, file_name), get_scan_time(CsvReader, file_name) * 1.1)
+
+    def test_sample_faster(self):
+        self.assertLess(get_scan_time(MappedCsvReader, self.file_name, 20),
+                        get_scan_time(MappedCsvReader, self.file_name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,28 @@
+import asyncio
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
 import unittest
-from program import Salary, Vacancy, DataSet, HelpMethods
+from contextlib import redirect_stdout
+from unittest import mock
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+from program import Salary, Vacancy, VacancyFilter, CsvReader, MappedCsvReader, DataSet, SharedDataSet, HelpMethods, \
+    InputConnect, report
+from service import ReportService
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 class SalaryTests(unittest.TestCase):
@@ -28,6 +51,22 @@ class SalaryTests(unittest.TestCase):
     def test_to_float_from_eur(self):
         self.assertEqual(float(Salary([10.0, 30.0, 'EUR'])), 1198.0)
 
+    def test_to_float_unknown_currency(self):
+        with self.assertRaises(ValueError):
+            float(Salary([10.0, 30.0, 'XYZ']))
+
+    def test_convert(self):
+        self.assertEqual(Salary.convert([10.0, '10'], ['20', 30.0], ['RUR', 'eur']).tolist(), [15.0, 1198.0])
+
+    def test_convert_equal_to_float(self):
+        values = [[1000, 2500, 'AZN'], [333, 777, 'UZS'], [12345.5, 23456.5, 'KZT'], [7, 9, 'BYR']]
+        converted = Salary.convert(*zip(*values)).tolist()
+        self.assertEqual(converted, [float(Salary(value)) for value in values])
+
+    def test_convert_unknown_currency(self):
+        with self.assertRaises(ValueError):
+            Salary.convert([10], [20], ['XYZ'])
+
 
 class VacancyTests(unittest.TestCase):
 
@@ -52,6 +91,12 @@ class VacancyTests(unittest.TestCase):
     def test_vacancyis_not_suitible(self):
         self.assertFalse(self.vacancy.is_suitible('Not suitible'))
 
+    def test_vacancy_pickle(self):
+        vacancy = pickle.loads(pickle.dumps(self.vacancy))
+        self.assertEqual([vacancy.get_name(), vacancy.get_area(), vacancy.get_date(), vacancy.get_salary(),
+                          vacancy.get_salary_values()],
+                         ['Руководитель', 'Санкт-Петербург', 2022, 90000.0, (80000.0, 100000.0, 'RUR')])
+
 
 class TestDataSet(unittest.TestCase):
 
@@ -64,6 +109,674 @@ class TestDataSet(unittest.TestCase):
     def test_dataset_length(self):
         self.assertEqual(self.dataset._DataSet__len, 1)
 
+    def test_dataset_rejected(self):
+        self.assertEqual(self.dataset.get_rejected(), {
+            'short_row': 0,
+            'missing_field': 0,
+            'missing_salary': 1,
+            'bad_salary': 0,
+            'unknown_currency': 0,
+            'bad_date': 0,
+        })
+
+    def test_statistics_equal_to_separate_queries(self):
+        vacancy_filter = VacancyFilter('substring', 'Руководитель')
+        self.assertEqual(self.dataset.get_vacancies_statistics(vacancy_filter), (
+            self.dataset.get_vacancies_years(),
+            self.dataset.get_vacancies_years(lambda x: x.is_suitible('Руководитель')),
+            *self.dataset.get_vacancies_cities()
+        ))
+
+    def test_statistics_when_nothing_suitible(self):
+        s_filtered = self.dataset.get_vacancies_statistics(VacancyFilter('names', ['Программист']))[1]
+        self.assertEqual(s_filtered, {2022: [0, 0]})
+
+
+class TestDataSetValidation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, 'vacancies.csv')
+        self.quarantine_file = os.path.join(self.directory.name, 'rejected.csv')
+
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('\n'.join([
+                'name,key_skills,salary_from,salary_to,salary_currency,area_name,published_at',
+                'Программист,,10,20,RUR,Москва,2022-07-17T18:23:06+0300',
+                'Аналитик,SQL,10,20,XYZ,Москва,2022-07-17T18:23:06+0300',
+                'Аналитик,SQL,десять,20,RUR,Москва,2022-07-17T18:23:06+0300',
+                'Аналитик,SQL,10,20,RUR,Москва,вчера',
+                'Аналитик,SQL,10',
+            ]))
+
+        self.dataset = DataSet(self.file_name, self.quarantine_file)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_empty_not_required_field(self):
+        self.assertEqual(len(self.dataset.get_vacancies()), 1)
+
+    def test_rejected(self):
+        self.assertEqual(
+            {reason: count for reason, count in self.dataset.get_rejected().items() if count != 0},
+            {'short_row': 1, 'bad_salary': 1, 'unknown_currency': 1, 'bad_date': 1}
+        )
+
+    def test_quarantine_file(self):
+        with open(self.quarantine_file, mode='r', encoding='utf-8') as file:
+            rows = file.read().splitlines()
+
+        self.assertEqual(rows[0].split(',')[-1], 'reject_reason')
+        self.assertEqual([row.split(',')[-1] for row in rows[1:]],
+                         ['unknown_currency', 'bad_salary', 'bad_date', 'short_row'])
+
+    def test_noisy_values(self):
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,10,20, <b>rur</b>,Москва, 2021-01-01\n')
+
+        self.assertEqual(DataSet(self.file_name).get_vacancies_years(), {2021: [15, 1]})
+
+    def test_not_finite_salary(self):
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,nan,20,RUR,Москва,2021-01-01\n'
+                       'Программист,10,inf,RUR,Москва,2021-01-01\n'
+                       'Программист,10,20,RUR,Москва,2021-01-01\n')
+
+        dataset = DataSet(self.file_name)
+        self.assertEqual(dataset.get_rejected()['bad_salary'], 2)
+        self.assertEqual(dataset.get_vacancies_years(), {2021: [15, 1]})
+
+    def test_noisy_salary_converted_in_bulk(self):
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,<b>100</b>,200,RUR,Москва,2021-01-01\n'
+                       'Аналитик,10,30,EUR,Москва,2021-01-01\n')
+
+        vacancies = DataSet(self.file_name).get_vacancies()
+
+        with mock.patch.object(Salary, '__float__', side_effect=AssertionError('зарплата не посчитана заранее')):
+            self.assertEqual([vacancy.get_salary() for vacancy in vacancies], [150.0, 1198.0])
+
+    def test_missing_required_column(self):
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('name,salary_from\nПрограммист,10\n')
+
+        with self.assertRaises(ValueError):
+            DataSet(self.file_name)
+
+
+class TestMappedDataSet(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, 'vacancies.csv')
+
+        with open(self.file_name, mode='w', encoding='utf-8-sig', newline='') as file:
+            file.write('\r\n'.join([
+                'name,description,salary_from,salary_to,salary_currency,area_name,published_at',
+                '"Программист ""Python""","<p>многострочное\r\nописание, с запятыми</p>",100,200,RUR,Москва,2022-01-01',
+                '',
+                'Аналитик,,10,20,EUR,"Санкт-Петербург",2021-05-05T10:00:00+0300',
+                'Аналитик,"x",10,,EUR,Москва,2021-05-05T10:00:00+0300',
+                'Тестировщик,"""",5,6,KZT,Казань,2020-01-01T10:00:00+0300',
+            ]))
+
+        self.dataset = DataSet(self.file_name)
+        self.mapped = DataSet(self.file_name, engine='mmap')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_statistics(self):
+        vacancy_filter = VacancyFilter('substring', 'Python')
+        self.assertEqual(self.mapped.get_vacancies_statistics(vacancy_filter),
+                         self.dataset.get_vacancies_statistics(vacancy_filter))
+
+    def test_rejected(self):
+        self.assertEqual(self.mapped.get_rejected(), self.dataset.get_rejected())
+
+    def test_quoted_name(self):
+        self.assertEqual(self.mapped.get_vacancies()[0].get_name(), 'Программист "Python"')
+
+    def test_test_csv(self):
+        self.assertEqual(DataSet('test.csv', engine='mmap').get_vacancies_years(), {2022: [90000, 1]})
+
+    def test_same_values_as_csv_reader(self):
+        with open(self.file_name, mode='w', encoding='utf-8', newline='') as file:
+            file.write('\r\n'.join([
+                'name,description,salary_from,salary_to,salary_currency,area_name,published_at',
+                'Программист,"<a href=""x"">, ""y""</a>\r\nещё",10,20,RUR,"Москва",2022-01-01',
+                'Аналитик 5"6,"a""b"x,10,20,RUR,Казань,"2022-01-01"',
+                'Аналитик,,,,,,',
+                '',
+                '"Тестировщик","",1,2,"RUR","Уфа, центр","2020"',
+                'a"b,"c,d",e',
+            ]))
+
+        rows = []
+        for reader_class in [CsvReader, MappedCsvReader]:
+            with reader_class(self.file_name) as reader:
+                rows.append([values for values, _ in reader.read_rows(list(range(7)))])
+
+        self.assertEqual(rows[1], rows[0])
+
+    def test_noisy_date(self):
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,10,20,RUR,Москва, 2021-01-01\n'
+                       'Программист,10,20,RUR,Москва,<b>2020</b>-01-01\n')
+
+        self.assertEqual(DataSet(self.file_name, engine='mmap').get_vacancies_years(),
+                         DataSet(self.file_name).get_vacancies_years())
+
+    def test_compressed(self):
+        with open(self.file_name, mode='rb') as file:
+            content = file.read()
+        with open(self.file_name, mode='wb') as file:
+            file.write(gzip.compress(content))
+
+        with self.assertRaises(ValueError):
+            DataSet(self.file_name, engine='mmap')
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            DataSet(self.file_name, engine='pandas')
+
+
+class TestCompressedDataSet(unittest.TestCase):
+
+    def setUp(self) -> None:
+        with open('test.csv', mode='rb') as file:
+            self.content = file.read()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_dataset(self, compress, file_name: str) -> DataSet:
+        path = os.path.join(self.directory.name, file_name)
+        with open(path, mode='wb') as file:
+            file.write(compress(self.content))
+        return DataSet(path)
+
+    def test_gzip(self):
+        self.assertEqual(len(self.get_dataset(gzip.compress, 'test.csv.gz').get_vacancies()), 1)
+
+    def test_bz2(self):
+        self.assertEqual(len(self.get_dataset(bz2.compress, 'test.csv.bz2').get_vacancies()), 1)
+
+    def test_xz(self):
+        self.assertEqual(len(self.get_dataset(lzma.compress, 'test.csv.xz').get_vacancies()), 1)
+
+    @unittest.skipUnless(zstandard, 'не установлен пакет zstandard')
+    def test_zstd(self):
+        self.assertEqual(len(self.get_dataset(zstandard.compress, 'test.csv.zst').get_vacancies()), 1)
+
+    def test_zstd_without_package(self):
+        path = os.path.join(self.directory.name, 'test.csv.zst')
+        with open(path, mode='wb') as file:
+            file.write(b'\x28\xb5\x2f\xfd' + bytes(8))
+
+        with mock.patch('program.zstandard', None), self.assertRaises(ImportError):
+            DataSet(path)
+
+    def test_format_detected_by_content(self):
+        self.assertEqual(len(self.get_dataset(gzip.compress, 'test.csv').get_vacancies()), 1)
+
+
+class TestShardedDataSet(unittest.TestCase):
+
+    def setUp(self) -> None:
+        with open('test.csv', mode='r', encoding='utf-8-sig') as file:
+            self.content = file.read()
+        self.directory = tempfile.TemporaryDirectory()
+
+        for name in ['2021.csv', '2022.csv']:
+            with open(os.path.join(self.directory.name, name), mode='w', encoding='utf-8') as file:
+                file.write(self.content)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_directory(self):
+        self.assertEqual(len(DataSet(self.directory.name).get_vacancies()), 2)
+
+    def test_directory_skips_other_files(self):
+        with gzip.open(os.path.join(self.directory.name, '2023.csv.gz'), mode='wt', encoding='utf-8') as file:
+            file.write(self.content)
+        for name in ['README.md', '.DS_Store']:
+            with open(os.path.join(self.directory.name, name), mode='wb') as file:
+                file.write(b'\x00\x01 not a csv')
+
+        self.assertEqual(len(DataSet(self.directory.name).get_vacancies()), 3)
+
+    def test_glob(self):
+        self.assertEqual(len(DataSet(os.path.join(self.directory.name, '*.csv')).get_vacancies()), 2)
+
+    def test_list_merges_statistics(self):
+        files = [os.path.join(self.directory.name, name) for name in ['2021.csv', '2022.csv']]
+        self.assertEqual(DataSet(files).get_vacancies_years(), {2022: [90000, 2]})
+
+    def test_different_title(self):
+        with open(os.path.join(self.directory.name, '2023.csv'), mode='w', encoding='utf-8') as file:
+            file.write(self.content.replace('area_name', 'city', 1))
+
+        with self.assertRaises(ValueError):
+            DataSet(self.directory.name)
+
+    def test_quarantine_joined(self):
+        quarantine_file = os.path.join(self.directory.name, 'rejected.txt')
+        DataSet(os.path.join(self.directory.name, '*.csv'), quarantine_file)
+
+        with open(quarantine_file, mode='r', encoding='utf-8') as file:
+            self.assertEqual(file.read().count('missing_salary'), 2)
+        self.assertEqual(os.listdir(self.directory.name).count('rejected.txt.0'), 0)
+
+    def test_no_files(self):
+        with self.assertRaises(ValueError):
+            DataSet(os.path.join(self.directory.name, '*.xlsx'))
+
+
+class TestReportService(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.service = ReportService('test.csv', cache_size=1)
+
+    def request(self, request_line: str):
+        async def send():
+            server = await self.service.start('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f'{request_line}\r\nHost: localhost\r\n\r\n'.encode('utf-8'))
+            response = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return response
+
+        head, body = asyncio.run(send()).split(b'\r\n\r\n', 1)
+        return int(head.split()[1]), body
+
+    def test_stats(self):
+        status, body = self.request('GET /stats?vacancy=%D0%A0%D1%83%D0%BA%D0%BE%D0%B2%D0%BE%D0%B4%D0%B8%D1%82%D0%B5%D0%BB%D1%8C HTTP/1.1')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['salaries_filtered'], {'2022': [90000, 1]})
+
+    def test_stats_names(self):
+        name = quote('Руководитель проекта по системам связи и информационным технологиям')
+        status, body = self.request(f'GET /stats?vacancy={name}&vacancy={quote("Программист")}&filter=names HTTP/1.1')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['salaries_filtered'], {'2022': [90000, 1]})
+
+    def test_stats_without_vacancy(self):
+        self.assertEqual(self.request('GET /stats HTTP/1.1')[0], 400)
+
+    def test_unknown_filter(self):
+        self.assertEqual(self.request('GET /stats?vacancy=a&filter=lambda HTTP/1.1')[0], 400)
+
+    def test_unknown_path(self):
+        self.assertEqual(self.request('GET /report.docx?vacancy=a HTTP/1.1')[0], 404)
+
+    def test_statistics_cached(self):
+        async def get_twice():
+            await self.service.load()
+            first = await self.service.get_statistics('Руководитель')
+            return first, await self.service.get_statistics('Руководитель')
+
+        first, second = asyncio.run(get_twice())
+        self.assertIs(first, second)
+
+    def test_cache_evicted(self):
+        async def get_evicted():
+            await self.service.load()
+            first = await self.service.get_statistics('Руководитель')
+            await self.service.get_statistics('Программист')
+            return first, await self.service.get_statistics('Руководитель')
+
+        first, second = asyncio.run(get_evicted())
+        self.assertIsNot(first, second)
+
+    def test_reload_during_artifact(self):
+        async def get_artifact():
+            await self.service.load()
+            loop = asyncio.get_running_loop()
+            get_statistics = DataSet.get_vacancies_statistics
+            stale = []
+
+            def reload_during(dataset, vacancy_filter):
+                asyncio.run_coroutine_threadsafe(self.service.load(), loop).result()
+                stale.append(get_statistics(dataset, vacancy_filter))
+                return stale[0]
+
+            with mock.patch.object(DataSet, 'get_vacancies_statistics', reload_during):
+                artifact = await self.service.get_artifact('Руководитель', 'xlsx')
+
+            return stale[0], await self.service.get_statistics('Руководитель'), \
+                artifact, await self.service.get_artifact('Руководитель', 'xlsx')
+
+        self.service.cache_size = 4
+        stale, fresh, stale_artifact, fresh_artifact = asyncio.run(get_artifact())
+        self.assertEqual(self.service.get_version(), 2)
+        self.assertIsNot(stale, fresh)
+        self.assertIsNot(stale_artifact, fresh_artifact)
+
+
+class TestReportCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        self.statistics = ({2022: [90000, 2]}, {2022: [90000, 1]}, [['Москва', 1.0]], [['Москва', 90000]])
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_excel_cached(self):
+        report('Руководитель', *self.statistics).generate_excel()
+        rep = report('Руководитель', *self.statistics)
+        rep.generate_excel()
+        self.assertEqual(rep.get_cache_hits(), {'report.xlsx': True})
+
+    def test_changed_inputs(self):
+        report('Руководитель', *self.statistics).generate_excel()
+        rep = report('Программист', *self.statistics)
+        rep.generate_excel()
+        self.assertEqual(rep.get_cache_hits(), {'report.xlsx': False})
+
+    def test_modified_file(self):
+        report('Руководитель', *self.statistics).generate_excel()
+        with open('report.xlsx', mode='ab') as file:
+            file.write(b'0')
+        rep = report('Руководитель', *self.statistics)
+        rep.generate_excel()
+        self.assertEqual(rep.get_cache_hits(), {'report.xlsx': False})
+
+    def test_cache_disabled(self):
+        report('Руководитель', *self.statistics).generate_excel()
+        rep = report('Руководитель', *self.statistics, use_cache=False)
+        rep.generate_excel()
+        self.assertEqual(rep.get_cache_hits(), {'report.xlsx': False})
+
+    def test_render_version(self):
+        report('Руководитель', *self.statistics).generate_excel()
+        with mock.patch.object(report, '_report__render_version', 2):
+            rep = report('Руководитель', *self.statistics)
+            rep.generate_excel()
+        self.assertEqual(rep.get_cache_hits(), {'report.xlsx': False})
+
+    def test_image_cached(self):
+        import matplotlib.pyplot as plt
+
+        report('Руководитель', *self.statistics).generate_image()
+        plt.close('all')
+        rep = report('Руководитель', *self.statistics)
+        with mock.patch('program.plt.show') as show:
+            rep.generate_image()
+        plt.close('all')
+        show.assert_called_once()
+        self.assertEqual(rep.get_cache_hits(), {'graph.png': True})
+        with open('.report_cache.json', mode='r', encoding='utf-8') as file:
+            self.assertTrue(json.load(file)['graph.png']['cache_hit'])
+
+
+class TestDataSetCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dataset = DataSet('test.csv', cache_size=2)
+        self.vacancy_filter = VacancyFilter('substring', 'Руководитель')
+
+    def test_hit(self):
+        first = self.dataset.get_vacancies_statistics(self.vacancy_filter)
+        second = self.dataset.get_vacancies_statistics(VacancyFilter('substring', 'Руководитель'))
+        self.assertEqual(first, second)
+        self.assertEqual(self.dataset.get_cache_info(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_result_is_copy(self):
+        self.dataset.get_vacancies_years()[2022][0] = 0
+        self.assertEqual(self.dataset.get_vacancies_years(), {2022: [90000, 1]})
+
+    def test_function_not_cached(self):
+        self.dataset.get_vacancies_years(lambda x: x.is_suitible('Руководитель'))
+        self.assertEqual(self.dataset.get_cache_info()['size'], 0)
+
+    def test_eviction(self):
+        self.dataset.get_vacancies_years()
+        self.dataset.get_vacancies_cities()
+        self.dataset.get_vacancies_years(self.vacancy_filter)
+        self.dataset.get_vacancies_years()
+        self.assertEqual(self.dataset.get_cache_info(), {'hits': 0, 'misses': 4, 'size': 2})
+
+    def test_invalidated_on_append(self):
+        self.dataset.get_vacancies_years()
+        self.dataset.append('test.csv')
+        self.assertEqual(self.dataset.get_vacancies_years(), {2022: [90000, 2]})
+        self.assertEqual(self.dataset.get_cache_info()['hits'], 0)
+
+    def test_append_during_query(self):
+        get_structured_salaries = DataSet.get_structured_salaries
+
+        def append_during(vacancies, scale=1):
+            result = get_structured_salaries(vacancies, scale)
+            self.dataset.append('test.csv')
+            return result
+
+        with mock.patch.object(DataSet, 'get_structured_salaries', append_during):
+            self.assertEqual(self.dataset.get_vacancies_years(), {2022: [90000, 1]})
+
+        self.assertEqual(self.dataset.get_vacancies_years(), {2022: [90000, 2]})
+
+    def test_concurrent_queries(self):
+        filters = [VacancyFilter('substring', str(i % 4)) for i in range(2000)]
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(self.dataset.get_vacancies_statistics, filters))
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(results[0], self.dataset.get_vacancies_statistics(filters[0]))
+        self.assertEqual(sum(self.dataset.get_cache_info()[key] for key in ['hits', 'misses']), 2001)
+
+    def test_pickle(self):
+        self.dataset.get_vacancies_years()
+        dataset = pickle.loads(pickle.dumps(self.dataset))
+        self.assertEqual(dataset.get_vacancies_years(), {2022: [90000, 1]})
+        self.assertEqual(dataset.get_cache_info()['hits'], 1)
+
+
+class TestSampledDataSet(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, 'vacancies.csv')
+
+        with open(self.file_name, mode='w', encoding='utf-8') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+            for i in range(20):
+                file.write(f'Программист,{1000 * i},{1000 * i + 2000},RUR,Москва,{2020 + i % 2}-01-01\n')
+
+        self.vacancy_filter = VacancyFilter('substring', 'Программист')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_counts_scaled(self):
+        dataset = DataSet(self.file_name, sample_rate=0.25)
+        self.assertEqual(len(dataset.get_vacancies()), 5)
+        self.assertEqual(dataset.get_vacancies_years(), {2020: [9000, 20]})
+
+    def test_same_structures_for_both_engines(self):
+        self.assertEqual(DataSet(self.file_name, sample_rate=0.5).get_vacancies_statistics(self.vacancy_filter),
+                         DataSet(self.file_name, engine='mmap', sample_rate=0.5)
+                         .get_vacancies_statistics(self.vacancy_filter))
+
+    def test_errors(self):
+        errors_all, errors_filtered, errors_fract, errors_cities = \
+            DataSet(self.file_name, sample_rate=0.25).get_vacancies_errors(self.vacancy_filter)
+
+        self.assertGreater(errors_all[2020][0], 0)
+        self.assertEqual(errors_filtered, errors_all)
+        self.assertEqual(errors_fract, {'Москва': 0.0})
+        self.assertEqual(errors_cities['Москва'], errors_all[2020][0])
+
+    def test_no_errors_for_full_dataset(self):
+        errors_all = DataSet(self.file_name).get_vacancies_errors()[0]
+        self.assertEqual(errors_all, {2020: [0, 0], 2021: [0, 0]})
+
+    def test_write_console(self):
+        dataset = DataSet(self.file_name, sample_rate=0.25)
+        output = io.StringIO()
+
+        with redirect_stdout(output):
+            InputConnect.write_console(*dataset.get_vacancies_statistics(self.vacancy_filter),
+                                       dataset.get_vacancies_errors(self.vacancy_filter))
+
+        self.assertIn('2020: 9000 ±', output.getvalue())
+        self.assertIn("'Москва': 1.0 ± 0.0", output.getvalue())
+
+    def test_effective_rate(self):
+        dataset = DataSet(self.file_name, sample_rate=0.8)
+        self.assertEqual(dataset.get_sample_rate(), 1.0)
+        self.assertEqual(DataSet(self.file_name, sample_rate=0.3).get_sample_rate(), 1 / 3)
+
+    def test_wrong_rate(self):
+        with self.assertRaises(ValueError):
+            DataSet(self.file_name, sample_rate=0)
+
+    def test_parse_rate(self):
+        self.assertEqual(InputConnect.parse_sample_rate('0.5'), 0.5)
+
+        for value in ['abc', '0', '1.5', 'nan']:
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                InputConnect.parse_sample_rate(value)
+
+    def test_rate_not_entered(self):
+        connect = InputConnect()
+
+        with mock.patch('builtins.input', side_effect=['test.csv', 'Руководитель', 'Статистика', EOFError]), \
+                redirect_stdout(io.StringIO()):
+            connect.read_console()
+
+        self.assertEqual(connect.sample_rate, 1.0)
+
+
+def get_shared_statistics(name: str, vacancy: str):
+    with SharedDataSet.attach(name) as shared:
+        return shared.get_vacancies_statistics(VacancyFilter('substring', vacancy))
+
+
+class TestSharedDataSet(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dataset = DataSet('test.csv')
+        self.shared = SharedDataSet.publish(self.dataset)
+
+    def tearDown(self) -> None:
+        self.shared.close()
+        self.shared.unlink()
+
+    def test_statistics(self):
+        vacancy_filter = VacancyFilter('substring', 'Руководитель')
+        self.assertEqual(self.shared.get_vacancies_statistics(vacancy_filter),
+                         self.dataset.get_vacancies_statistics(vacancy_filter))
+
+    def test_years_and_cities(self):
+        self.assertEqual(self.shared.get_vacancies_years(), self.dataset.get_vacancies_years())
+        self.assertEqual(self.shared.get_vacancies_cities(), self.dataset.get_vacancies_cities())
+
+    def test_worker_process(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(get_shared_statistics, [self.shared.get_name()] * 2, ['Руководитель', 'Аналитик']))
+
+        self.assertEqual(results[0][1], {2022: [90000, 1]})
+        self.assertEqual(results[1][1], {2022: [0, 0]})
+
+    def test_independent_process(self):
+        code = 'import sys\nfrom program import SharedDataSet\n' \
+               'with SharedDataSet.attach(sys.argv[1]) as shared:\n    print(shared.get_vacancies_years())'
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(sys.modules['program'].__file__)))
+        process = subprocess.run([sys.executable, '-c', code, self.shared.get_name()], capture_output=True,
+                                 text=True, env=env)
+
+        self.assertEqual(process.stdout.strip(), '{2022: [90000, 1]}')
+        self.assertNotIn('leaked', process.stderr)
+        with SharedDataSet.attach(self.shared.get_name()) as attached:
+            self.assertEqual(attached.get_vacancies_years(), {2022: [90000, 1]})
+
+    @unittest.skipIf(sys.version_info >= (3, 13), 'attach не подменяет resource_tracker.register')
+    def test_publish_during_attach(self):
+        register = mock.Mock(wraps=resource_tracker.register)
+
+        def attach_and_publish(_):
+            with SharedDataSet.attach(self.shared.get_name()):
+                pass
+            shared = SharedDataSet.publish(self.dataset)
+            shared.close()
+            shared.unlink()
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with mock.patch.object(resource_tracker, 'register', register), ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(attach_and_publish, range(200)))
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual([call.args[1] for call in register.call_args_list].count('shared_memory'), 200)
+
+    def test_attached_read_only(self):
+        with SharedDataSet.attach(self.shared.get_name()) as attached:
+            with self.assertRaises(ValueError):
+                attached.unlink()
+            self.assertEqual(attached.get_vacancies_years(), {2022: [90000, 1]})
+
+    def test_empty_dataset(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'empty.csv')
+            with open(file_name, mode='w', encoding='utf-8') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+
+            with SharedDataSet.publish(DataSet(file_name)) as shared:
+                self.assertEqual(shared.get_vacancies_statistics(VacancyFilter('substring', 'a')), ({}, {}, [], []))
+
+
+class TestVacancyFilter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vacancy = Vacancy(['Руководитель группы', '80000', '100000', 'RUR', 'Москва', '2022-07-17T18:23:06+0300'], ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'])
+
+    def test_substring(self):
+        self.assertTrue(VacancyFilter('substring', 'группы')(self.vacancy))
+
+    def test_regex(self):
+        self.assertTrue(VacancyFilter('regex', '^Руководитель')(self.vacancy))
+
+    def test_regex_not_suitible(self):
+        self.assertFalse(VacancyFilter('regex', 'группы$ы')(self.vacancy))
+
+    def test_names(self):
+        self.assertFalse(VacancyFilter('names', {'Руководитель'})(self.vacancy))
+
+    def test_names_single_string(self):
+        vacancy_filter = VacancyFilter('names', 'Руководитель группы')
+        self.assertTrue(vacancy_filter(self.vacancy))
+        self.assertEqual(vacancy_filter.get_key(), ('names', frozenset({'Руководитель группы'})))
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            VacancyFilter('lambda', 'Руководитель')
+
+    def test_pickle(self):
+        vacancy_filter = pickle.loads(pickle.dumps(VacancyFilter('names', {'Руководитель группы'})))
+        self.assertTrue(vacancy_filter(self.vacancy))
+
 
 class TestHelpMethods(unittest.TestCase):
 